@@ -58,7 +58,7 @@ class Birthday(Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
 
-        self.config = Cfg(self)
+        self.config = Cfg(self, storage=bot.storage)
 
         self.defaults_guild = GuildData(channel=0, role=0)
         self.config.defaults_guild(self.defaults_guild)
@@ -78,6 +78,7 @@ class Birthday(Cog):
     def cog_unload(self):
         self.on = False
         self.task.cancel()
+        self.config.flush()
         del self.task
         del self
 
@@ -96,8 +97,8 @@ class Birthday(Cog):
                     if guild:
                         await self.treat_guild(
                             guild,
-                            guild_config.get(),
-                            self.config.all_members(guild)
+                            await guild_config.aget(),
+                            await self.config.aall_members(guild)
                         )
 
     ###################################### BIRTHDAY COMMANDS ######################################
@@ -112,8 +113,8 @@ class Birthday(Cog):
         guild = ctx.guild
         await self.treat_guild(
             guild,
-            self.config.guild(guild).get(),
-            self.config.all_members(guild)
+            await self.config.guild(guild).aget(),
+            await self.config.aall_members(guild)
         )
 
     @admin()
@@ -133,9 +134,7 @@ class Birthday(Cog):
 
         else:
             guild_config = self.config.guild(ctx.guild)
-            guild_data = guild_config.get()
-            guild_data.channel = channel.id
-            guild_config.set(guild_data)
+            guild_config.update("channel", channel.id)
 
             embed = Embed(
                 title='Channel Changed',
@@ -159,10 +158,7 @@ class Birthday(Cog):
 
         else:
             guild_config = self.config.guild(ctx.guild)
-            guild_data = guild_config.get()
-
-            guild_data.role = role.id
-            guild_config.set(guild_data)
+            guild_config.update("role", role.id)
 
             embed = Embed(
                 title='Role Changed',
@@ -247,7 +243,7 @@ class Birthday(Cog):
     @birthday.command(name='list')
     async def list_(self, ctx: Context):
         guild = ctx.guild
-        members_configs = self.config.all_members(guild)
+        members_configs = await self.config.aall_members(guild)
 
         # Dict[int, MemberData]
         members_data = {i: g.get() for i, g in members_configs.items()}
@@ -260,6 +256,7 @@ class Birthday(Cog):
 
             member = guild.get_member(member_id)
             if member: # Member found case -> directly using their name
+                member_data = member_data.copy()
                 member_data.name = member.name
 
             to_sort.append(member_data)
@@ -340,9 +337,8 @@ class Birthday(Cog):
     @staticmethod
     def update_names(members_configs: Dict[Member, Group]):
         for member, group in members_configs.items():
-            member_data = group.get()
-            member_data.name = member.name
-            group.set(member_data)
+            if group.get().name != member.name:
+                group.update("name", member.name)
 
     @staticmethod
     async def wait_for_tomorrow(loop: AbstractEventLoop):
@@ -25,7 +25,7 @@ class Guild(Objectify):
     def __init__(self, channel: int, role: int):
         super().__init__(channel=channel, role=role)
 
-class Date(Objectify):
+class Date(Objectify, compact=True):
     day: int
     month: int
 
@@ -47,7 +47,7 @@ class Date(Objectify):
     def convert_month(month: int) -> str:
         return MONTHS[month - 1]
 
-class Member(Objectify):
+class Member(Objectify, compact=True):
     birthday: Date
     name: str
 
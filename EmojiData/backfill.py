@@ -0,0 +1,276 @@
+############################################# IMPORTS #############################################
+
+#################### DISCORD ####################
+from discord import (
+    Forbidden,
+    HTTPException,
+    Message,
+    Object,
+    TextChannel
+)
+
+##################### UTILS #####################
+import asyncio
+import random
+
+from aiohttp import ClientError
+from collections import (
+    Counter,
+    defaultdict
+)
+from datetime import datetime as dt
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union
+)
+
+############################################# GLOBALS #############################################
+
+BACKFILL_CONCURRENCY = 4
+CHECKPOINT_MESSAGES = 500
+MAX_RETRIES = 5
+
+# exponential backoff bounds, in seconds, when discord doesn't tell how long to wait
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+############################################# CLASSES #############################################
+
+class Counts:
+    """Emoji counts changes of a guild and of its members, keyed by
+    emoji ref, along with the name of every emoji ref.
+
+    """
+    __slots__ = ("guild", "members", "names")
+
+    def __init__(self):
+        self.guild: Counter = Counter()
+        self.members: Dict[int, Counter] = defaultdict(Counter)
+        self.names: Dict[str, str] = {}
+
+    def add(
+        self, member_id: Union[int, None],
+        emojis: List[Tuple[str, Union[int, str]]], treat_type: int = 0
+    ):
+        """Adds treat_type to the counts of every emoji of emojis, as
+        (name, ref) pairs, for the guild, and for member_id if not `None`.
+
+        """
+        for name, ref in emojis:
+            ref = str(ref)
+            self.guild[ref] += treat_type
+            if member_id is not None:
+                self.members[member_id][ref] += treat_type
+            self.names.setdefault(ref, name)
+
+    def merge(self, other: "Counts"):
+        """Adds every count of other to these counts."""
+        self.guild.update(other.guild)
+        for member_id, counts in other.members.items():
+            self.members[member_id].update(counts)
+        for ref, name in other.names.items():
+            self.names.setdefault(ref, name)
+
+class Backfill:
+    """Counts the emojis of the history of channels, scanning up to
+    concurrency channels at once, each into its own `Counts`.
+
+    Every `CHECKPOINT_MESSAGES` messages, and once a channel is done,
+    its counts are merged into the backfill counts, along with the id
+    and timestamp of its last counted message, so that `state` and
+    `collect` always match, and an interrupted backfill resumes from
+    them with `Backfill.from_state` without counting a message twice.
+
+    Requests failing because of rate limits or discord errors are
+    retried after a backoff, from the last message counted.
+
+    Parameters
+        cog: `EmojiData`
+            The cog counting messages and reactions
+        channels: List[`TextChannel`]
+            The channels to scan
+        after: `datetime`
+            The date to scan from
+        before: `datetime`
+            The date to scan until
+        treat_type: `int` = `0`
+            The count of every emoji found, see `EmojiData.APPEND`
+        concurrency: `int` = `BACKFILL_CONCURRENCY`
+            The number of channels to scan at once
+        checkpoints: Dict[`str`, Dict[`str`, Any]] = `None`
+            The checkpoints to resume from, by channel id
+
+    """
+    def __init__(
+        self, cog: Any, channels: List[TextChannel], after: dt, before: dt,
+        treat_type: int = 0, concurrency: int = BACKFILL_CONCURRENCY,
+        checkpoints: Dict[str, Dict[str, Any]] = None
+    ):
+        self.cog = cog
+        self.channels = channels
+        self.after = after
+        self.before = before
+        self.treat_type = treat_type
+
+        # last counted message and whether done, by channel id
+        self.checkpoints: Dict[str, Dict[str, Any]] = checkpoints or {}
+        # checkpointed counts, not collected yet
+        self.counts = Counts()
+        # messages scanned so far, by channel
+        self.progress: Dict[TextChannel, int] = {channel: 0 for channel in channels}
+
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @classmethod
+    def from_state(
+        cls, cog: Any, channels: List[TextChannel], state: Dict[str, Any],
+        concurrency: int = BACKFILL_CONCURRENCY
+    ) -> "Backfill":
+        """Returns the backfill `Backfill.state` was called on."""
+        return cls(
+            cog=cog,
+            channels=channels,
+            after=dt.fromtimestamp(state["after"]),
+            before=dt.fromtimestamp(state["before"]),
+            treat_type=state["treat_type"],
+            concurrency=concurrency,
+            checkpoints=state["channels"]
+        )
+
+    @property
+    def total(self) -> int:
+        return sum(self.progress.values())
+
+    def state(self) -> Dict[str, Any]:
+        """Returns the backfill bounds and checkpoints, as json-like data,
+        matching the counts returned by `Backfill.collect` so far.
+
+        """
+        return {
+            "after": self.after.timestamp(),
+            "before": self.before.timestamp(),
+            "treat_type": self.treat_type,
+            "channels": {
+                channel_id: dict(checkpoint)
+                for channel_id, checkpoint in self.checkpoints.items()
+            }
+        }
+
+    def collect(self) -> Counts:
+        """Returns the counts checkpointed since last call."""
+        counts, self.counts = self.counts, Counts()
+        return counts
+
+    def checkpoint(
+        self, channel: TextChannel, counts: Counts, last: Message = None, done: bool = False
+    ):
+        self.counts.merge(counts)
+
+        checkpoint = self.checkpoints.setdefault(str(channel.id), {})
+        if last is not None:
+            checkpoint["last_id"] = last.id
+            checkpoint["last_timestamp"] = last.created_at.timestamp()
+        checkpoint["done"] = done
+
+    async def run(self):
+        """Scans every channel not done yet, see `Backfill.collect`.
+        If a channel fails, the other ones are cancelled.
+
+        """
+        tasks = [asyncio.ensure_future(self.scan(channel)) for channel in self.channels]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def scan(self, channel: TextChannel):
+        """Counts channel history from its checkpoint, retrying failed
+        requests up to `MAX_RETRIES` times in a row.
+        Channels the bot can't read are skipped.
+
+        """
+        checkpoint = self.checkpoints.get(str(channel.id), {})
+        if checkpoint.get("done"):
+            return
+
+        after = Object(checkpoint["last_id"]) if "last_id" in checkpoint else self.after
+        counts = Counts()
+        last = None
+        attempt = 0
+
+        async with self._semaphore:
+            while True:
+                try:
+                    async for message in channel.history(
+                        limit=None, after=after, before=self.before, oldest_first=True
+                    ):
+                        # message counted only once fully treated, so that it can be retried
+                        message_counts = Counts()
+                        self.cog.treat_message(
+                            message=message,
+                            treat_type=self.treat_type,
+                            counts=message_counts
+                        )
+                        await self.cog.treat_reactions(
+                            reactions=message.reactions,
+                            treat_type=self.treat_type,
+                            counts=message_counts
+                        )
+                        counts.merge(message_counts)
+
+                        after = last = message
+                        attempt = 0
+                        self.progress[channel] += 1
+                        if not self.progress[channel] % CHECKPOINT_MESSAGES:
+                            self.checkpoint(channel, counts, last)
+                            counts = Counts()
+                    break
+
+                except Forbidden:
+                    print(f"Skipped {channel.name} from {channel.guild.name}: missing access")
+                    break
+
+                except (HTTPException, ClientError, asyncio.TimeoutError) as error:
+                    if not retryable(error) or attempt >= MAX_RETRIES:
+                        raise
+
+                    delay = backoff(error, attempt)
+                    attempt += 1
+                    print((
+                        f"Retrying {channel.name} from {channel.guild.name} "
+                        f"in {delay:.1f}s: {error!r}"
+                    ))
+                    await asyncio.sleep(delay)
+
+        self.checkpoint(channel, counts, last, done=True)
+
+        print((
+            f"Processed {channel.name} from {channel.guild.name} - "
+            f"Channel: {self.progress[channel]} - Guild: {self.total}"
+        ))
+
+############################################ FUNCTIONS ############################################
+
+def retryable(error: Exception) -> bool:
+    """Returns whether a request failing with error is worth retrying."""
+    if isinstance(error, HTTPException):
+        return error.status == 429 or error.status >= 500
+    return True
+
+def backoff(error: Exception, attempt: int) -> float:
+    """Returns the time to wait before retrying a request failing with
+    error, as told by discord if rate limited, exponential otherwise.
+
+    """
+    response = getattr(error, "response", None)
+    try:
+        delay = float(response.headers["Retry-After"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+
+    return delay * random.uniform(1.0, 1.25) # jitter, so that channels don't retry together
@@ -22,48 +22,60 @@ from discord.ext.commands import (
 from discord.ext.commands import group
 
 ##################### UTILS #####################
-import re
+import asyncio
 import time
 
+from collections import defaultdict
+from copy import deepcopy
 from datetime import datetime as dt
-from emoji import (
-    demojize,
-    emojize
-)
+from emoji import demojize
 from typing import (
     Dict,
     List,
+    Set,
+    Tuple,
     Union
 )
 from utils import Config as Cfg
-from utils import (
-    ask_confirmation,
-    update_config
+from utils.checks import (
+    admin,
+    ask_confirmation
 )
-from utils.checks import admin
 from utils.exceptions import InvalidArguments
 
+from .backfill import (
+    Backfill,
+    Counts
+)
+from .matcher import MATCHER
+
 ############################################### COGS ##############################################
 
 class EmojiData(Cog):
-    FIND_CUSTOM_EMOJIS = re.compile("(?<=<:)\w+:\d+(?=>)").findall
-    FIND_EMOJIS = re.compile("(?<=:)\w+(?=:)").findall
+    FIND_EMOJIS = MATCHER.find
 
     APPEND = 1
     REMOVE = -1
 
+    ATTRIBUTION = "attribution"
+    BACKFILL = "backfill"
     COUNT = "count"
     DATA = "data"
     LAST_CHECKED = "last_checked"
     NAME = "name"
 
+    PERSIST_INTERVAL = 60.0
+    PROGRESS_INTERVAL = 5.0
+
     ######################################### CONSTRUCTOR #########################################
 
     def __init__(self, bot: Bot):
         self.bot = bot
-        self.config = Cfg(self)
+        self.config = Cfg(self, storage=bot.storage)
 
         self.default_guild = {
+            self.ATTRIBUTION: True,
+            self.BACKFILL: None,
             self.DATA: {},
             self.LAST_CHECKED: 1420066800.0,
         }
@@ -72,174 +84,284 @@ class EmojiData(Cog):
         self.default_member = {}
         self.config.defaults_member(self.default_member)
 
+        # counts changes and checks not persisted yet, by guild id
+        self.pending: Dict[int, Counts] = defaultdict(Counts)
+        self.checks: Dict[int, float] = {}
+        # backfills running, interrupted and finished, by guild id
+        self.backfills: Dict[int, Backfill] = {}
+        self.interrupted: Dict[int, Backfill] = {}
+        self.finished: Set[int] = set()
+
+        self.persister = self.bot.loop.create_task(self.persist_periodically())
         self.bot.loop.create_task(self.startup_check())
 
     async def startup_check(self):
         await self.bot.wait_until_ready()
 
-        guilds_configs = self.config.get_all_guilds()
+        guilds_configs = self.config.all_guilds()
 
         for guild_id, guild_config in guilds_configs.items():
             guild = self.bot.get_guild(guild_id)
             if guild:
                 guild_data = guild_config.get()
-                self.current_guild = guild
+
+                state = guild_data.get(self.BACKFILL)
+                if state:                                           # Interrupted backfill
+                    await self.run_backfill(
+                        guild=guild,
+                        backfill=Backfill.from_state(self, guild.text_channels, state)
+                    )
 
                 await self.treat_guild(
                     guild=guild,
                     last_checked=guild_data[self.LAST_CHECKED]
                 )
 
-                self.update_check(guild)
-
     ########################################### UNLOADER ##########################################
 
     def cog_unload(self):
-        self.update_check(self.current_guild)
+        self.persister.cancel()
+        self.persist()
+        self.config.flush()
 
         del self
 
     ############################################# CORE ############################################
 
     def update_check(self, guild: Guild):
-        update_config(
-            config=self.config.guild(guild),
-            attribute=self.LAST_CHECKED,
-            value=dt.utcnow().timestamp()
+        self.checks[guild.id] = dt.utcnow().timestamp()
+
+    def count(
+        self, guild: Guild, member: Union[Member, User],
+        emojis: List[Tuple[str, Union[int, str]]], treat_type: int = 0,
+        counts: Counts = None
+    ):
+        """Adds treat_type to the in memory counts of every emoji of
+        emojis, as (name, ref) pairs, for guild and member.
+        Counts are only written to config files by `EmojiData.persist`.
+
+        Parameters
+            counts: `Counts` = `None`
+                The counts to add to, the pending counts of guild by default
+
+        """
+        if counts is None:
+            counts = self.pending[guild.id]
+
+        counts.add(
+            member_id=member.id if isinstance(member, Member) else None,
+            emojis=emojis,
+            treat_type=treat_type
         )
 
+    def persist(self):
+        """Writes every counts change and check made since last call
+        to config files, along with the checkpoints of running backfills.
+
+        Changes of a guild whose config files fail to load are kept
+        for the next call, without keeping other guilds from being written.
+
+        """
+        pending, self.pending = self.pending, defaultdict(Counts)
+        checks, self.checks = self.checks, {}
+        finished, self.finished = self.finished, set()
+        interrupted, self.interrupted = self.interrupted, {}
+
+        backfills = {}
+        for guild_id, backfill in {**interrupted, **self.backfills}.items():
+            backfills[guild_id] = backfill.state()
+            pending[guild_id].merge(backfill.collect())
+
+        for guild_id in pending.keys() | checks.keys() | backfills.keys() | finished:
+            counts = pending.get(guild_id) or Counts()
+
+            # loading everything first, so that nothing is applied twice if it fails
+            try:
+                guild_config = self.config.guild_from_id(guild_id)
+                guild_data = guild_config.get()
+                members = []
+                for member_id, member_counts in counts.members.items():
+                    member_config = self.config.member_from_ids(guild_id, member_id)
+                    members.append((member_config, member_config.get(), member_counts))
+            except Exception as error:
+                print(f"EMOJIDATA: persisting guild {guild_id} failed: {error!r}")
+                self.pending[guild_id].merge(counts)
+                if guild_id in checks:
+                    self.checks.setdefault(guild_id, checks[guild_id])
+                if guild_id in interrupted:
+                    self.interrupted.setdefault(guild_id, interrupted[guild_id])
+                if guild_id in finished:
+                    self.finished.add(guild_id)
+                continue
+
+            self.update_data(guild_data[self.DATA], counts.guild, counts.names)
+            if guild_id in checks:
+                guild_data[self.LAST_CHECKED] = checks[guild_id]
+            if guild_id in backfills:
+                guild_data[self.BACKFILL] = backfills[guild_id]
+            elif guild_id in finished:
+                guild_data[self.BACKFILL] = None
+            guild_config.set(guild_data)
+
+            for member_config, member_data, member_counts in members:
+                if self.update_data(member_data, member_counts, counts.names):
+                    member_config.set(member_data)
+
+    async def apersist(self):
+        """Same as `EmojiData.persist`, but loads the config files to
+        write to beforehand without blocking the event loop.
+
+        """
+        guild_ids = {*self.pending, *self.checks, *self.backfills, *self.interrupted, *self.finished}
+        for guild_id in guild_ids:
+            counts = self.pending.get(guild_id)
+            try:
+                await self.config.guild_from_id(guild_id).aget()
+                for member_id in list(counts.members if counts else []):
+                    await self.config.member_from_ids(guild_id, member_id).aget()
+            except Exception: # reported by persist, which keeps the changes
+                pass
+
+        self.persist()
+
+    async def persist_periodically(self):
+        while True:
+            await asyncio.sleep(self.PERSIST_INTERVAL)
+            try:
+                await self.apersist()
+            except Exception as error:
+                print(f"EMOJIDATA: persisting failed: {error!r}")
+
+    def discard(self, guild: Guild):
+        """Forgets counts changes of guild not persisted yet."""
+        self.pending.pop(guild.id, None)
+
     def update_data(
         self, data: Dict[str, Dict[str, Union[str, int]]],
-        emoji_ref: Union[int, str], emoji_name: str, treat_type: int = 0
-    ):
-        emoji_data = data.get(str(emoji_ref), {self.NAME: emoji_name, self.COUNT: 0})
-        emoji_data[self.COUNT] += treat_type
-        data[emoji_ref] = emoji_data
+        counts: Dict[str, int], names: Dict[str, str]
+    ) -> bool:
+        """Adds counts to data, and returns whether data changed."""
+        changed = False
+        for ref, delta in counts.items():
+            if delta:
+                emoji_data = data.setdefault(ref, {self.NAME: names[ref], self.COUNT: 0})
+                emoji_data[self.COUNT] += delta
+                changed = True
+
+        return changed
+
+    @staticmethod
+    def reaction_emoji(reaction: Reaction) -> Tuple[str, Union[int, str]]:
+        """Returns the name and ref of the emoji of reaction."""
+        emoji = reaction.emoji
+        if reaction.custom_emoji:
+            return emoji.name, emoji.id
+        else:
+            ref = MATCHER.name(emoji) or demojize(emoji).replace(":", "")
+            return ref, ref
+
+    @staticmethod
+    async def fetch_users(reaction: Reaction) -> List[Union[Member, User]]:
+        return [user async for user in reaction.users()]
+
+    def attribution(self, guild: Guild) -> bool:
+        """Returns whether reactions of guild are counted per member,
+        which requires fetching the users of every reaction.
+
+        """
+        return self.config.guild(guild).get().get(self.ATTRIBUTION, True)
 
     async def treat_reactions(
-        self, reactions: List[Reaction], treat_type: int = 0
+        self, reactions: List[Reaction], treat_type: int = 0, counts: Counts = None
     ):
-        for reaction in reactions:
-            async for user in reaction.users():
-                self.treat_reaction(reaction, user, treat_type)
+        if not reactions:
+            return
+
+        if self.attribution(reactions[0].message.channel.guild):
+            users = await asyncio.gather(*(self.fetch_users(reaction) for reaction in reactions))
+            for reaction, reaction_users in zip(reactions, users):
+                for user in reaction_users:
+                    self.treat_reaction(reaction, user, treat_type, counts)
+
+        else:
+            for reaction in reactions:
+                self.treat_reaction_count(reaction, treat_type, counts)
 
     def treat_reaction(
-        self, reaction: Reaction, member: Union[Member, User], treat_type: int = 0
+        self, reaction: Reaction, member: Union[Member, User], treat_type: int = 0,
+        counts: Counts = None
     ):
         if member.bot:                                              # Excluding bot from statistics
             return
 
-        emoji = reaction.emoji
-        if reaction.custom_emoji:
-            ref = emoji.id
-            name = emoji.name
-        else:
-            ref = demojize(emoji).replace(":", "")
-            name = ref
+        name, ref = self.reaction_emoji(reaction)
 
         print(f"reaction: {reaction.message.created_at.isoformat(sep=' ')} {name}")
 
-        guild_config = self.config.guild(reaction.message.channel.guild)
-        guild_data = guild_config.get()
-        self.update_data(
-            data=guild_data[self.DATA],
-            emoji_ref=ref,
-            emoji_name=name,
+        self.count(
+            guild=reaction.message.channel.guild,
+            member=member,
+            emojis=[(name, ref)],
             treat_type=treat_type,
+            counts=counts
         )
-        guild_config.set(guild_data)
-
-        if isinstance(member, Member):
-            member_config = self.config.member(member)
-            member_data = member_config.get()
-            self.update_data(
-                data=member_data,
-                emoji_ref=ref,
-                emoji_name=name,
-                treat_type=treat_type
-            )
-            member_config.set(member_data)
 
-    def treat_message(self, message: Message, treat_type: int = 0):
-        member = message.author
+    def treat_reaction_count(self, reaction: Reaction, treat_type: int = 0, counts: Counts = None):
+        """Counts every user of reaction for the guild only, without
+        fetching them, so that only the reaction of the bot itself
+        can be excluded.
 
-        if member.bot:                                              # Excluding bot from statistics
+        """
+        users = reaction.count - reaction.me                        # Excluding bot from statistics
+        if not users:
             return
 
-        elif isinstance(message.channel, TextChannel):
-            text = message.content
-            custom_emojis = self.FIND_CUSTOM_EMOJIS(text)
-            custom_emojis = [e.split(":") for e in custom_emojis]
+        name, ref = self.reaction_emoji(reaction)
 
-            text = demojize(text)
-            casual_emojis = self.FIND_EMOJIS(text)
-            casual_emojis = [e for e in casual_emojis if f":{e}:" != emojize(f":{e}:")]
-            casual_emojis = [[e, e] for e in casual_emojis]
+        print(f"reactions: {reaction.message.created_at.isoformat(sep=' ')} {name} x{users}")
 
-            emojis = custom_emojis + casual_emojis
+        self.count(
+            guild=reaction.message.channel.guild,
+            member=None,
+            emojis=[(name, ref)],
+            treat_type=treat_type * users,
+            counts=counts
+        )
 
-            guild_config = self.config.guild(message.channel.guild)
-            guild_data = guild_config.get()
-            if isinstance(member, Member):
-                member_config = self.config.member(member)
-                member_data = member_config.get()
+    def treat_message(self, message: Message, treat_type: int = 0, counts: Counts = None):
+        member = message.author
+
+        if member.bot:                                              # Excluding bot from statistics
+            return
+
+        elif isinstance(message.channel, TextChannel):
+            emojis = self.FIND_EMOJIS(message.content)
 
             print(f"message: {message.created_at.isoformat(sep=' ')} ", end=" ")
-            for name, ref in emojis:
-                print(name, end=" ")
-                self.update_data(
-                    data=guild_data[self.DATA],
-                    emoji_ref=ref,
-                    emoji_name=name,
-                    treat_type=treat_type,
-                )
-                if isinstance(member, Member):
-                    self.update_data(
-                        data=member_data,
-                        emoji_ref=ref,
-                        emoji_name=name,
-                        treat_type=treat_type,
-                    )
-            print("")
+            print(*(name for name, _ in emojis))
 
-            guild_config.set(guild_data)
-            if isinstance(member, Member):
-                member_config.set(member_data)
+            self.count(
+                guild=message.channel.guild,
+                member=member,
+                emojis=emojis,
+                treat_type=treat_type,
+                counts=counts
+            )
 
     async def treat_channel(
         self, channel: TextChannel, after: dt = dt.fromtimestamp(1420066800.0),
-        stop: dt = None, treat_type: int = 0, count_total: int = 0,
-        count_channels: List[TextChannel] = [], progress_message: Message = None
-    ) -> List[int]:
-
-        count_channel = 0
-        async for message in channel.history(limit=None, after=after, before=stop):
-            self.treat_message(
-                message=message,
-                treat_type=treat_type
-            )
-            await self.treat_reactions(
-                reactions=message.reactions,
-                treat_type=treat_type
-            )
-
-            count_channel += 1
-            count_total += 1
-            if progress_message and not count_total % 100:
-                await self.edit_progress_message(
-                    channel=channel,
-                    count_channel=count_channel,
-                    count_total=count_total,
-                    count_channels=count_channels,
-                    progress_message=progress_message,
-                )
-
-        print((
-            f"Processed {channel.name} from {channel.guild.name} - "
-            f"Channel: {count_channel} - Guild: {count_total}"
-        ))
+        stop: dt = None, treat_type: int = 0
+    ):
+        backfill = Backfill(
+            cog=self,
+            channels=[channel],
+            after=after,
+            before=stop or dt.utcnow(),
+            treat_type=treat_type
+        )
+        await backfill.run()
 
-        return count_total, count_channel
+        self.pending[channel.guild.id].merge(backfill.collect())
 
     async def treat_guild(
         self, guild: Guild, last_checked: float = 1420066800.0, stop: dt = None,
@@ -254,31 +376,60 @@ class EmojiData(Cog):
         else:
             progress_message = None
 
-        after = dt.fromtimestamp(last_checked)
-        count_total = 0
-        count_channels = []
-        for channel in guild.text_channels:
-            count_total, count_channel = await self.treat_channel(
-                channel=channel,
-                after=after,
-                stop=stop,
-                count_channels=count_channels,
-                count_total=count_total,
-                progress_message=progress_message,
-                treat_type=treat_type,
-            )
-            count_channels.append((str(channel), count_channel))
+        backfill = Backfill(
+            cog=self,
+            channels=guild.text_channels,
+            after=dt.fromtimestamp(last_checked),
+            before=stop or dt.utcnow(),
+            treat_type=treat_type
+        )
+        await self.run_backfill(guild, backfill, progress_message)
 
-    async def edit_progress_message(
-        self, progress_message: Message, channel: TextChannel, count_channel: int,
-        count_total: int, count_channels: List[TextChannel]
+    async def run_backfill(
+        self, guild: Guild, backfill: Backfill, progress_message: Message = None
     ):
+        """Runs backfill, checkpointing it with guild pending counts
+        until it is done, so that it is resumed by `startup_check` if
+        interrupted. Messages sent after backfill end are counted by
+        listeners, so it becomes guild last check.
+
+        """
+        self.backfills[guild.id] = backfill
+        self.checks[guild.id] = backfill.before.timestamp()
+
+        if progress_message:
+            reporter = self.bot.loop.create_task(
+                self.report_progress(backfill, progress_message)
+            )
+
+        try:
+            await backfill.run()
+        except BaseException:
+            if self.backfills.get(guild.id) is backfill:    # Checkpoints persisted once more
+                self.interrupted[guild.id] = self.backfills.pop(guild.id)
+            raise
+        else:
+            if self.backfills.get(guild.id) is backfill:    # Not reset meanwhile
+                del self.backfills[guild.id]
+                self.pending[guild.id].merge(backfill.collect())
+                self.finished.add(guild.id)
+        finally:
+            if progress_message:
+                reporter.cancel()
+                await self.edit_progress_message(backfill, progress_message)
+
+    async def report_progress(self, backfill: Backfill, progress_message: Message):
+        while True:
+            await asyncio.sleep(self.PROGRESS_INTERVAL)
+            await self.edit_progress_message(backfill, progress_message)
+
+    async def edit_progress_message(self, backfill: Backfill, progress_message: Message):
         message = ""
-        for c_name, c_count in count_channels:
-            message += f"{c_name} - {c_count}" + "\n"
-        message += f"{channel.name} process: {count_channel}" + "\n"
+        for channel, count in backfill.progress.items():
+            if count:
+                message += f"{channel.name} - {count}" + "\n"
         message += "\n"
-        message += f"Total processed messages: {count_total}"
+        message += f"Total processed messages: {backfill.total}"
 
         embed = Embed(
             title="Count progress",
@@ -428,8 +579,6 @@ class EmojiData(Cog):
             treat_type=self.APPEND
         )
 
-        self.update_check(guild)
-
     ######################################## STAT COMMANDS ########################################
 
     @group(name="emojidata")
@@ -440,15 +589,18 @@ class EmojiData(Cog):
     @emojidata_group.command(name="reset")
     async def emojidata_reset(self, ctx: Context):
         """ : resets the emoji data list."""
-        answer = await ask_confirmation(
-            ctx=ctx,
-            bot=self.bot
-        )
+        answer = await ask_confirmation(ctx=ctx)
         if answer:
             guild = ctx.guild
 
-            self.config.guild(guild).set(self.default_guild)
-            self.config.clear_all_members(guild)
+            self.discard(guild)
+            self.backfills.pop(guild.id, None)
+            self.interrupted.pop(guild.id, None)
+
+            guild_data = deepcopy(self.default_guild)
+            guild_data[self.ATTRIBUTION] = self.attribution(guild)
+            self.config.guild(guild).set(guild_data)
+            self.config.clear_members(guild)
 
             embed = Embed(
                 title="Data Reset",
@@ -469,6 +621,21 @@ class EmojiData(Cog):
             )
             await ctx.send(embed=embed)
 
+    @admin()
+    @emojidata_group.command(name="attribution")
+    async def emojidata_attribution(self, ctx: Context, enabled: bool):
+        """**(enabled)** : counts reactions per member, or only for the guild, which is faster."""
+        self.config.guild(ctx.guild).update(self.ATTRIBUTION, enabled)
+
+        embed = Embed(
+            title="Attribution Changed",
+            description=(
+                "Reactions are now counted per member" if enabled else
+                "Reactions are now only counted for the guild"
+            )
+        )
+        await ctx.send(embed=embed)
+
     @emojidata_group.command(name="guild")
     async def emojidata_guild(self, ctx: Context, top: int = 10):
         """**(top=10)** : shows guild emoji data."""
@@ -484,6 +651,7 @@ class EmojiData(Cog):
 
         guild = ctx.guild
 
+        await self.apersist()
         data = self.config.guild(guild).get()[self.DATA]
 
         embed = await self.make_message(
@@ -509,6 +677,7 @@ class EmojiData(Cog):
                 pass
             member = ctx.author
 
+        await self.apersist()
         data = self.config.member(member).get()
 
         embed = await self.make_message(
@@ -533,14 +702,13 @@ class EmojiData(Cog):
         if data:
             message = ""
             for emoji_id, emoji_name, count in data[:top]:
-                try:
-                    e = await EmojiConverter().convert(ctx, emoji_id)
-                    if not e.is_usable():
-                        e = e.name
-                except BadArgument:
-                    if f":{emoji_name}:" != emojize(f":{emoji_name}:", ):
-                        e = emojize(f":{emoji_name}:")
-                    else:
+                e = MATCHER.emoji(emoji_id)
+                if e is None:
+                    try:
+                        e = await EmojiConverter().convert(ctx, emoji_id)
+                        if not e.is_usable():
+                            e = e.name
+                    except BadArgument:
                         e = emoji_name
                 message += f"{e} - {count}\n"
 
@@ -550,4 +718,4 @@ class EmojiData(Cog):
         return Embed(
             title=title,
             description=message
-        )
\ No newline at end of file
+        )
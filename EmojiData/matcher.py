@@ -0,0 +1,125 @@
+############################################# IMPORTS #############################################
+
+import re
+
+from emoji import EMOJI_DATA
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Tuple
+)
+
+############################################# GLOBALS #############################################
+
+FIND_CUSTOM_EMOJI = re.compile(r"<:(\w+):(\d+)>").match
+
+# code points closer than that are merged into one candidates range
+RANGE_GAP = 256
+
+END = ""
+
+############################################# CLASSES #############################################
+
+class EmojiMatcher:
+    """Finds the custom and unicode emojis of a text in a single scan.
+
+    A regular expression made of a few code point ranges skips to the
+    next character that may start an emoji, `'<'` for custom emojis,
+    from which the longest unicode emoji is looked up in a trie.
+
+    Parameters
+        names: Dict[`str`, `str`]
+            The name of every unicode emoji, for example
+            `'grinning_face'` for `'😀'`
+
+    """
+    def __init__(self, names: Dict[str, str]):
+        self.names = names
+        self.emojis = {}
+        for emoji, name in names.items():
+            self.emojis.setdefault(name, emoji)
+
+        self.trie = {}
+        for emoji, name in names.items():
+            node = self.trie
+            for char in emoji:
+                node = node.setdefault(char, {})
+            node[END] = name
+
+        self._search = re.compile(f"[<{ranges_pattern(self.trie.keys())}]").search
+
+    @classmethod
+    def from_emoji_data(cls) -> "EmojiMatcher":
+        """Returns the matcher of every emoji known to the `emoji` package,
+        named as by `emoji.demojize`.
+
+        """
+        return cls({emoji: data["en"].strip(":") for emoji, data in EMOJI_DATA.items()})
+
+    def find(self, text: str) -> List[Tuple[str, str]]:
+        """Returns the (name, ref) pairs of every emoji of text, in order.
+        Refs are ids for custom emojis, and names for unicode emojis.
+
+        """
+        emojis = []
+        length = len(text)
+        position = 0
+
+        while match := self._search(text, position):
+            start = match.start()
+
+            if text[start] == "<":
+                if custom := FIND_CUSTOM_EMOJI(text, start):
+                    emojis.append(custom.groups())
+                    position = custom.end()
+                    continue
+
+            node, name, end = self.trie, None, start
+            while end < length and (node := node.get(text[end])) is not None:
+                end += 1
+                if END in node:
+                    name, position = node[END], end
+
+            if name is None:
+                position = start + 1
+            else:
+                emojis.append((name, name))
+
+        return emojis
+
+    def name(self, emoji: str) -> str:
+        """Returns the name of a unicode emoji, `None` if unknown."""
+        return self.names.get(emoji)
+
+    def emoji(self, name: str) -> str:
+        """Returns the first unicode emoji of names named name,
+        `None` if unknown.
+
+        """
+        return self.emojis.get(name)
+
+############################################ FUNCTIONS ############################################
+
+def ranges_pattern(chars: Iterable[str], gap: int = RANGE_GAP) -> str:
+    """Returns a character class content matching every char of chars,
+    as a few ranges, since long classes of astral characters are
+    checked one character at a time. Ranges may match other chars,
+    ascii ones excepted, since they make most of chat messages.
+
+    """
+    ranges = []
+    for code in sorted(map(ord, chars)):
+        if ranges and ranges[-1][0] >= 0x80 and code - ranges[-1][1] <= gap:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+
+    return "".join(
+        re.escape(chr(first)) if first == last else f"{re.escape(chr(first))}-{re.escape(chr(last))}"
+        for first, last in ranges
+    )
+
+############################################# GLOBALS #############################################
+
+MATCHER = EmojiMatcher.from_emoji_data()
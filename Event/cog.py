@@ -49,7 +49,7 @@ class Event(Cog):
     def __init__(self, bot):
         self.bot = bot
 
-        self.config = Cfg(self)
+        self.config = Cfg(self, storage=bot.storage, lazy=True)
 
         self.defaults_guild = GuildData(events=[])
         self.config.defaults_guild(self.defaults_guild)
@@ -67,6 +67,7 @@ class Event(Cog):
         for t in self.tasks:
             t.cancel()
             del t
+        self.config.flush()
         del self
 
         print("EVENT_COG: unloaded")
@@ -78,9 +79,10 @@ class Event(Cog):
         for guild_id, guild_config in guilds_configs.items():
             guild = self.bot.get_guild(guild_id)
             if guild:
+                guild_data = await guild_config.aget()
                 await self.add_events(
                     guild,
-                    *(guild_config.get().events)
+                    *(guild_data.events)
                 )
 
     ######################################## EVENT COMMANDS #######################################
@@ -137,32 +139,31 @@ class Event(Cog):
                     )
 
             guild_config = self.config.guild(guild)
-            guild_data = guild_config.get()
 
-            # checking if same event already exists
-            events = ImprovedList(guild_data.events)
-            try:
-                events.index(
-                    (title.lower(), date),
-                    key=lambda e: (e.title.lower(), e.date)
-                )
-                raise InvalidArguments(
-                    ctx=ctx,
-                    title="Name Error",
-                    message="There is another event on same date with same name"
+            async with guild_config.locked() as guild_data:
+                # checking if same event already exists
+                events = ImprovedList(guild_data.events)
+                try:
+                    events.index(
+                        (title.lower(), date),
+                        key=lambda e: (e.title.lower(), e.date)
+                    )
+                    raise InvalidArguments(
+                        ctx=ctx,
+                        title="Name Error",
+                        message="There is another event on same date with same name"
+                    )
+                except ValueError:
+                    pass
+
+                # appending event
+                event = EventData(
+                    channel=channel_id,
+                    date=date,
+                    participants=[p.id for p in participants],
+                    title=title
                 )
-            except ValueError:
-                pass
-
-            # appending event
-            event = EventData(
-                channel=channel_id,
-                date=date,
-                participants=[p.id for p in participants],
-                title=title
-            )
-            guild_data.events.append(event)
-            guild_config.set(guild_data)
+                guild_data.events.append(event)
 
             # starting event scheduler
             await self.add_events(guild, event)
@@ -218,41 +219,40 @@ class Event(Cog):
     async def remove(self, ctx: Context, title: str, time: str = None):
         guild = ctx.guild
         guild_config = self.config.guild(guild)
-        guild_data = guild_config.get()
 
-        matches = [e for e in guild_data.events if e.title.lower() == title.lower()]
         try:
-            if not matches:
-                raise InvalidArguments(
-                    ctx=ctx,
-                    title="Title Error",
-                    message="Couldn't find event with provided name"
-                )
-            elif len(matches) > 1:
-                if time:
-                    matches = [e for e in matches if e.datetime() == EventData.convert(time)]
-                    if not matches:
+            # data only locked, and written, while being edited
+            async with guild_config.locked() as guild_data:
+                matches = [e for e in guild_data.events if e.title.lower() == title.lower()]
+                if not matches:
+                    raise InvalidArguments(
+                        ctx=ctx,
+                        title="Title Error",
+                        message="Couldn't find event with provided name"
+                    )
+                elif len(matches) > 1:
+                    if time:
+                        matches = [e for e in matches if e.datetime() == EventData.convert(time)]
+                        if not matches:
+                            raise InvalidArguments(
+                                ctx=ctx,
+                                title="Date Error",
+                                message="Couldn't find event with provided date"
+                            )
+                    else:
                         raise InvalidArguments(
                             ctx=ctx,
                             title="Date Error",
-                            message="Couldn't find event with provided date"
+                            message="There are multiple events with same name, please provide a date"
                         )
-                else:
-                    raise InvalidArguments(
-                        ctx=ctx,
-                        title="Date Error",
-                        message="There are multiple events with same name, please provide a date"
-                    )
+
+                match = matches[0]
+                guild_data.events.remove(match)
 
         except InvalidArguments as error:
             await error.execute()
 
         else:
-            match = matches[0]
-            guild_data.events.remove(match)
-
-            guild_config.set(guild_data)
-
             def convert(p: int):
                 ret = guild.get_member(p)
                 if not ret:
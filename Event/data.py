@@ -11,7 +11,7 @@ DATETIME_FORMAT = "%Y-%m-%d_%H:%M:%S"
 
 ############################################# CLASSES #############################################
 
-class Event(Objectify):
+class Event(Objectify, compact=True):
     channel: int
     date: float
     participants: List[int]
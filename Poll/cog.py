@@ -34,11 +34,16 @@ class Poll(Cog):
     ######################################### CONSTRUCTOR #########################################
 
     def __init__(self, bot: Bot):
-        self.config = Cfg(self)
+        self.config = Cfg(self, storage=bot.storage)
 
         defaults = GuildData(channel=0)
         self.config.defaults_guild(defaults)
 
+    ########################################### UNLOADER ##########################################
+
+    def cog_unload(self):
+        self.config.flush()
+
     ######################################## POLL COMMANDS ########################################
 
     @admin()
@@ -115,9 +120,7 @@ class Poll(Cog):
 
         else:
             guild_config = self.config.guild(ctx.guild)
-            guild_data = guild_config.get()
-            guild_data.channel = channel.id
-            guild_config.set(guild_data)
+            guild_config.update("channel", channel.id)
 
             embed = Embed(
                 title='Channel Changed',
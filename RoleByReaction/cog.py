@@ -39,6 +39,7 @@ from typing import (
     Dict,
     List,
     Set,
+    Tuple,
     Union
 )
 from utils import (
@@ -62,7 +63,7 @@ class RoleByReaction(Cog):
 
     def __init__(self, bot: Bot):
         self.bot = bot
-        self.config = Cfg(self)
+        self.config = Cfg(self, storage=bot.storage)
 
         self.defaults = GuildData(
             channel=0,
@@ -72,11 +73,16 @@ class RoleByReaction(Cog):
         )
         self.config.defaults_guild(self.defaults)
 
+        self.indexes: Dict[int, Tuple[int, Dict[Union[int, str], int]]] = {}
+        self.config.on_change(self.config.GUILD, self._invalidate_index)
+
         self.bot.loop.create_task(self.startup_check())
 
     ########################################### UNLOADER ##########################################
 
     def cog_unload(self):
+        self.config.off_change(self.config.GUILD, self._invalidate_index)
+        self.config.flush()
         del self
 
     ########################################## SCHEDULER ##########################################
@@ -88,17 +94,31 @@ class RoleByReaction(Cog):
         for guild_id, guild_config in guilds_configs.items():
             guild = self.bot.get_guild(guild_id)
             if guild:
-                guild_data = guild_config.get()
+                guild_data = await guild_config.aget()
                 await self._treat_guild(guild, guild_data)
 
     ########################################### EVENTS ############################################
 
+    async def _get_index(self, guild: Guild) -> Tuple[int, Dict[Union[int, str], int]]:
+        """Returns the role by reaction message id of guild,
+        and its roles ids by emoji, kept until guild config changes.
+
+        """
+        try:
+            return self.indexes[guild.id]
+        except KeyError:
+            guild_data = await self.config.guild(guild).aget()
+            index = (guild_data.message, {c.emoji: c.role for c in guild_data.combinations})
+            return self.indexes.setdefault(guild.id, index)
+
+    def _invalidate_index(self, guild_id: int):
+        self.indexes.pop(guild_id, None)
+
     async def _treat_payload(self, payload: RawReactionActionEvent):
         guild = self.bot.get_guild(payload.guild_id)
         if guild:
-            guild_config = self.config.guild(guild)
-            guild_data = guild_config.get()
-            await self._treat_reaction(guild, guild_data, payload)
+            message_id, roles = await self._get_index(guild)
+            await self._treat_reaction(guild, message_id, roles, payload)
 
     @Cog.listener()
     async def on_raw_reaction_add(self, payload: RawReactionActionEvent):
@@ -121,14 +141,12 @@ class RoleByReaction(Cog):
         guild_config = self.config.guild(ctx.guild)
         guild_data = guild_config.get()
 
-        guild_data.title = title
+        guild_config.update("title", title)
         try:
             await self._edit_rbr_message(ctx, guild_data)
         except InvalidArguments:
             pass
 
-        guild_config.set(guild_data)
-
         embed = Embed(
             title='Title Changed',
             description=f'Successfully updated title to {title}'
@@ -140,51 +158,50 @@ class RoleByReaction(Cog):
     async def add(self, ctx: Context, emoji: EmojiType, *, role: RoleType):
         guild = ctx.guild
         guild_config = self.config.guild(guild)
-        guild_data = guild_config.get()
-
-        combinations = guild_data.combinations
 
         try:
             emoji = await self.import_emoji(ctx, emoji)
-            if emoji in [c.emoji for c in combinations]:
-                raise InvalidArguments(
-                    ctx=ctx,
-                    title="Role Error",
-                    message=f"Role {role} already used"
-                )
-
             role = await self.import_role(ctx, role)
-            if role.id in [c.role for c in combinations]:
-                raise InvalidArguments(
-                    ctx=ctx,
-                    title="Role Error",
-                    message=f"Role {role} already used"
-                )
 
-            if not can_give_role(role, ctx.me):
-                raise InvalidArguments(
-                    ctx=ctx,
-                    title="Role Error",
-                    message=f"Bot doesn't have enough rights to give role"
+            # data only locked, and written, while being edited
+            async with guild_config.locked() as guild_data:
+                combinations = guild_data.combinations
+
+                if emoji in [c.emoji for c in combinations]:
+                    raise InvalidArguments(
+                        ctx=ctx,
+                        title="Role Error",
+                        message=f"Role {role} already used"
+                    )
+
+                if role.id in [c.role for c in combinations]:
+                    raise InvalidArguments(
+                        ctx=ctx,
+                        title="Role Error",
+                        message=f"Role {role} already used"
+                    )
+
+                if not can_give_role(role, ctx.me):
+                    raise InvalidArguments(
+                        ctx=ctx,
+                        title="Role Error",
+                        message=f"Bot doesn't have enough rights to give role"
+                    )
+
+                new = Combination(
+                    emoji=emoji.id if hasattr(emoji, "id") else emoji,
+                    role=role.id
                 )
+                combinations.append(new)
         except InvalidArguments as error:
             await error.execute()
 
         else:
-            new = Combination(
-                emoji=emoji.id if hasattr(emoji, "id") else emoji,
-                role=role.id
-            )
-            combinations.append(new)
-
-            guild_data.combinations = combinations
             try:
                 await self._edit_rbr_message(ctx, guild_data)
             except InvalidArguments:
                 pass
 
-            guild_config.set(guild_data)
-
             embed = Embed(
                 title="Combination Added",
                 description=f"{emoji} successfully linked with {role}"
@@ -196,18 +213,8 @@ class RoleByReaction(Cog):
     async def remove(self, ctx: Context, *, element: Union[EmojiType, RoleType]):
         guild = ctx.guild
         guild_config = self.config.guild(guild)
-        guild_data = guild_config.get()
-
-        combinations = guild_data.combinations
 
         try:
-            if not combinations:
-                raise InvalidArguments(
-                    ctx=ctx,
-                    title="Data Error",
-                    message="No data registered yet"
-                )
-
             try:
                 element = await self.import_emoji(ctx, element)
                 element = element.id if hasattr(element, "id") else element
@@ -223,28 +230,36 @@ class RoleByReaction(Cog):
                         message="Reference not found"
                     )
 
-            if element not in [c[var] for c in combinations]:
-                raise InvalidArguments(
-                    ctx=ctx,
-                    message="Argument wasn't found in data"
-                )
+            # data only locked, and written, while being edited
+            async with guild_config.locked() as guild_data:
+                combinations = guild_data.combinations
+
+                if not combinations:
+                    raise InvalidArguments(
+                        ctx=ctx,
+                        title="Data Error",
+                        message="No data registered yet"
+                    )
+
+                if element not in [c[var] for c in combinations]:
+                    raise InvalidArguments(
+                        ctx=ctx,
+                        message="Argument wasn't found in data"
+                    )
+
+                for combination in combinations:
+                    if combination[var] == element:
+                        combinations.remove(combination)
+                        break
         except InvalidArguments as error:
             await error.execute()
 
         else:
-            for combination in combinations:
-                if combination[var] == element:
-                    combinations.remove(combination)
-                    break
-
-            guild_data.combinations = combinations
             try:
                 await self._edit_rbr_message(ctx, guild_data)
             except InvalidArguments:
                 pass
 
-            guild_config.set(guild_data)
-
             emoji = await self.import_emoji(ctx, combination.emoji)
             role = guild.get_role(combination.role)
 
@@ -278,7 +293,7 @@ class RoleByReaction(Cog):
     async def message(self, ctx: Context, channel_id: int, message_id: int):
         guild = ctx.guild
         guild_config = self.config.guild(guild)
-        guild_data = guild_config.get()
+        guild_data = guild_config.get().copy()
 
         guild_data.channel = channel_id
         guild_data.message = message_id
@@ -301,7 +316,7 @@ class RoleByReaction(Cog):
     async def show(self, ctx: Context):
         guild = ctx.guild
         guild_config = self.config.guild(guild)
-        guild_data = guild_config.get()
+        guild_data = guild_config.get().copy()
 
         guild_data.title = "Role By Reaction Template"
 
@@ -314,7 +329,7 @@ class RoleByReaction(Cog):
         answer = await ask_confirmation(ctx)
         if answer:
             guild = ctx.guild
-            self.config.guild(guild).set(self.defaults)
+            self.config.guild(guild).set(self.defaults.copy())
 
             embed = Embed(
                 title="Data Reset"
@@ -397,21 +412,14 @@ class RoleByReaction(Cog):
 
     @classmethod
     async def _treat_reaction(
-        cls, guild: Guild, guild_data: GuildData, payload: RawReactionActionEvent
+        cls, guild: Guild, message_id: int, roles: Dict[Union[int, str], int],
+        payload: RawReactionActionEvent
     ):
-        message_id = guild_data.message
         if payload.message_id == message_id:
-            combinations = guild_data.combinations
-
             emoji = payload.emoji
             emoji = emoji.id if emoji.id else str(emoji)
 
-            role = None
-            for c in combinations:
-                if c.emoji == emoji:
-                    role = guild.get_role(c.role)
-                    break
-
+            role = guild.get_role(roles[emoji]) if emoji in roles else None
             if role:
                 member = guild.get_member(payload.user_id)
                 if member:
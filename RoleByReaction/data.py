@@ -18,7 +18,7 @@ RoleType = Union[int, str, Role]
 
 ############################################# CLASSES #############################################
 
-class Combination(Objectify):
+class Combination(Objectify, compact=True):
     emoji: Union[int, str]
     role: int
 
@@ -31,7 +31,7 @@ class Welcome(Cog):
     ######################################### CONSTRUCTOR #########################################
 
     def __init__(self, bot: Bot):
-        self.config = Cfg(self)
+        self.config = Cfg(self, storage=bot.storage)
 
         defaults = GuildData(
             channel=0,
@@ -40,6 +40,11 @@ class Welcome(Cog):
         )
         self.config.defaults_guild(defaults)
 
+    ########################################### UNLOADER ##########################################
+
+    def cog_unload(self):
+        self.config.flush()
+
     ########################################### EVENTS ############################################
 
     @Cog.listener()
@@ -47,7 +52,7 @@ class Welcome(Cog):
         guild = member.guild
 
         # GuildData
-        guild_data = self.config.guild(guild).get()
+        guild_data = await self.config.guild(guild).aget()
 
         channel_id = guild_data.channel
         channel = guild.get_channel(channel_id)
@@ -86,9 +91,7 @@ class Welcome(Cog):
 
         else:
             guild_config = self.config.guild(ctx.guild)
-            guild_data = guild_config.get()
-            guild_data.channel = channel.id
-            guild_config.set(guild_data)
+            guild_config.update("channel", channel.id)
 
             embed = Embed(
                 title='Channel Changed',
@@ -100,10 +103,7 @@ class Welcome(Cog):
     @welcome.command()
     async def message(self, ctx: Context, *, message: str):
         guild_config = self.config.guild(ctx.guild)
-        guild_data = guild_config.get()
-
-        guild_data.message = message
-        guild_config.set(guild_data)
+        guild_config.update("message", message)
 
         embed = Embed(
             title='Message Changed',
@@ -118,10 +118,7 @@ class Welcome(Cog):
     @welcome.command()
     async def title(self, ctx: Context, *, title: str):
         guild_config = self.config.guild(ctx.guild)
-        guild_data = guild_config.get()
-
-        guild_data.title = title
-        guild_config.set(guild_data)
+        guild_config.update("title", title)
 
         embed = Embed(
             title='Message Changed',
@@ -1,7 +1,10 @@
 ############################################# IMPORTS #############################################
 
 #################### DISCORD ####################
-from discord import Intents
+from discord import (
+    File,
+    Intents
+)
 from discord.ext.commands import (
     Bot,
     Cog,
@@ -21,15 +24,33 @@ from Event import Event
 from Welcome import Welcome
 
 ##################### UTILS #####################
+import io
+import json
+import os
+import time
+
+from functools import partial
 from typing import (
     List,
     Union
 )
 from utils import (
+    EXECUTOR,
+    JsonBackend,
+    PackedBackend,
+    SqliteBackend,
+    StorageEngine,
     load,
     write
 )
-from utils.checks import is_owner
+from utils.archive import (
+    export_tree,
+    import_tree
+)
+from utils.checks import (
+    is_bot_owner,
+    is_owner
+)
 from utils.exceptions import InvalidArguments
 
 ############################################# GLOBAL ##############################################
@@ -47,6 +68,11 @@ COGS = {
 }
 NAMES_COGS_MAP = {cog.__name__.lower(): cog for cog in COGS}
 
+STORAGE_STATS_ROWS = 20
+
+EXPORTS_PATH = 'exports'
+UPLOAD_LIMIT = 8 << 20
+
 CONFIG_PATH = 'config.json'
 BOT_CONFIG = load(CONFIG_PATH, if_error={})
 
@@ -64,11 +90,19 @@ while not TOKEN:
         BOT_CONFIG['token'] = TOKEN
         write(CONFIG_PATH, BOT_CONFIG)
 
+if BOT_CONFIG.get('storage') == 'sqlite':
+    backend = SqliteBackend(BOT_CONFIG.get('database', 'config.sqlite3'))
+elif BOT_CONFIG.get('storage') == 'packed':
+    backend = PackedBackend()
+else:
+    backend = JsonBackend(shards=BOT_CONFIG.get('shards', 0))
+
 intents = Intents.all()
 bot = Bot(
     command_prefix=PREFIX,
     intents=intents
 )
+bot.storage = StorageEngine(backend, max_entries=BOT_CONFIG.get('cache_entries'))
 
 ############################################ FUNCTIONS ############################################
 
@@ -126,6 +160,10 @@ async def on_ready():
     """This runs when bot has done logging in and setting up.
 
     """
+    bot.storage.start(bot.loop)
+    if bot.owner_id is None:
+        bot.owner_id = (await bot.application_info()).owner.id
+
     cog_names_to_load = load(COG_PATH, if_error=[])
     cogs_to_load = {NAMES_COGS_MAP[cog_name] for cog_name in cog_names_to_load}
     load_cogs(bot, cogs_to_load)
@@ -233,7 +271,111 @@ async def bot_commands(ctx: Context):
 
     await ctx.send(message)
 
+@is_bot_owner()
+@bot.group(name='storage')
+async def storage_group(ctx: Context):
+    pass
+
+@is_bot_owner()
+@storage_group.command(name='stats')
+async def storage_stats(ctx: Context):
+    rows = bot.storage.metrics.summary()[:STORAGE_STATS_ROWS]
+    stats = bot.storage.stats()
+
+    lines = [
+        f"{'scope':<28}{'share':>7}{'read':>11}{'written':>11}{'ops':>8}{'ms':>10}",
+        *(
+            f"{row['scope'][:27]:<28}{row['share']:>7.1%}{row['bytes_read']:>11}"
+            f"{row['bytes_written']:>11}{row['operations']:>8}{row['total_ms']:>10.1f}"
+            for row in rows
+        ),
+        "",
+        f"cache: {stats['entries']} entries, {stats['dirty']} dirty, "
+        f"{stats['hits']} hits, {stats['misses']} misses"
+    ]
+    message = "\n".join(lines)
+
+    await ctx.send(f"```\n{message}\n```")
+
+@is_bot_owner()
+@storage_group.command(name='dump')
+async def storage_dump(ctx: Context):
+    metrics = {"engine": bot.storage.stats(), **bot.storage.metrics.snapshot()}
+    file = File(io.BytesIO(json.dumps(metrics, indent=4).encode()), filename='storage_metrics.json')
+
+    await ctx.send(file=file)
+
+@is_bot_owner()
+@storage_group.command(name='export')
+async def storage_export(ctx: Context, *cog_names: str):
+    names = {name.lower(): name for name in bot.cogs.keys()}
+    try:
+        cogs = [names[cog_name.lower()] for cog_name in cog_names] or sorted(names.values())
+    except KeyError as error:
+        error = InvalidArguments(
+            ctx=ctx,
+            message=f"{error.args[0]} not loaded"
+        )
+        await error.execute()
+        return
+
+    file = os.path.join(EXPORTS_PATH, f"config-{int(time.time())}.gz")
+
+    await bot.storage.aflush()
+    count = await bot.loop.run_in_executor(
+        EXECUTOR, partial(export_tree, bot.storage.backend, cogs, file)
+    )
+
+    message = f'Exported {count} documents of {", ".join(cogs)} to {file}'
+    if os.path.getsize(file) <= UPLOAD_LIMIT:
+        await ctx.send(message, file=File(file))
+    else:
+        await ctx.send(message)
+
+@is_bot_owner()
+@storage_group.command(name='import')
+async def storage_import(ctx: Context, file: str = None):
+    if ctx.message.attachments:
+        attachment = ctx.message.attachments[0]
+        file = os.path.join(EXPORTS_PATH, os.path.basename(attachment.filename))
+        os.makedirs(EXPORTS_PATH, exist_ok=True)
+        await attachment.save(file)
+
+    if not file or not os.path.isfile(file):
+        error = InvalidArguments(
+            ctx=ctx,
+            message="Attach an archive or give its path"
+        )
+        await error.execute()
+        return
+
+    # imported documents replace cached ones, even if changed meanwhile
+    await bot.storage.aflush()
+    try:
+        async with bot.storage.cache.batch():
+            count = await bot.loop.run_in_executor(EXECUTOR, partial(
+                import_tree, bot.storage.backend, file,
+                callback=partial(
+                    bot.loop.call_soon_threadsafe,
+                    partial(bot.storage.changed, discard=True)
+                )
+            ))
+    except ValueError as error:
+        await ctx.send(str(error))
+    else:
+        await ctx.send(f'Imported {count} documents from {file}')
+
+@is_bot_owner()
+@storage_group.command(name='reset')
+async def storage_reset(ctx: Context):
+    bot.storage.metrics.reset()
+
+    await ctx.send('Storage metrics reset')
+
 ############################################## MAIN ###############################################
 
 if __name__ == '__main__':
-    bot.run(TOKEN)
+    try:
+        bot.run(TOKEN)
+    finally:
+        bot.storage.close()
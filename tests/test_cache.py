@@ -0,0 +1,49 @@
+############################################# IMPORTS #############################################
+
+import asyncio
+import unittest
+
+from utils.cache import Cache
+
+############################################# CLASSES #############################################
+
+class TestCache(unittest.IsolatedAsyncioTestCase):
+
+    async def test_patch_during_commit(self):
+        """An update recorded while the entry is being written back
+        must keep it dirty, so that the next flush writes it.
+
+        """
+        disk = {}
+        writing = asyncio.Event()
+        resume = asyncio.Event()
+
+        async def awriter(path, data):
+            snapshot = dict(data)
+            writing.set()
+            await resume.wait()
+            disk[path] = snapshot
+
+        def writer(path, data):
+            disk[path] = dict(data)
+
+        cache = Cache(writer, awriter, patcher=lambda path, ops: len(ops))
+        data = {"a": 1, "b": 0}
+        cache.set("path", data)
+
+        commit = asyncio.ensure_future(cache.acommit("path"))
+        await writing.wait()
+        data["b"] = 42
+        cache.patch("path", '{"op": "set", "key": "b", "value": 42}')
+        resume.set()
+        await commit
+
+        self.assertEqual(disk["path"], {"a": 1, "b": 0})
+        self.assertTrue(cache.is_dirty("path"))
+
+        await cache.aflush()
+        self.assertEqual(disk["path"], {"a": 1, "b": 42})
+        self.assertFalse(cache.is_dirty("path"))
+
+if __name__ == "__main__":
+    unittest.main()
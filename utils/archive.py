@@ -0,0 +1,289 @@
+############################################# IMPORTS #############################################
+
+import gzip
+import json
+import os
+
+from itertools import islice
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Tuple
+)
+
+from . import codec
+from .storage import SYNC_SCHEDULER
+from .storage import Backend
+from .storage import (
+    atomic_write,
+    safe_open
+)
+
+############################################# GLOBALS #############################################
+
+ARCHIVE_HEADER = b"#config-archive 1\n"
+GZIP_MAGIC = b"\x1f\x8b"
+
+CHECKPOINT_DOCUMENTS = 10000
+PROGRESS_EXTENSION = ".progress"
+
+EXPORT = "export"
+IMPORT = "import"
+
+############################################ FUNCTIONS ############################################
+
+def export_tree(
+    backend: Backend, cogs: Iterable[str], file: str,
+    compress: bool = None, resume: bool = True
+) -> int:
+    """Writes every document of given cogs to a single archive file,
+    in one sequential pass over backend, with bounded memory.
+
+    The archive is a header line followed by one `'{path} {document}'`
+    line per document, optionally compressed with gzip.
+    Progress is saved every `CHECKPOINT_DOCUMENTS` documents, so that
+    an interrupted export resumes where it stopped, as long as the
+    documents of cogs weren't added or removed meanwhile.
+
+    Parameters
+        backend: `Backend`
+            The storage to export documents from
+        cogs: Iterable[`str`]
+            The names of the `Cog` to export
+        file: `str`
+            The archive file location
+        compress: `bool` = `None`
+            Whether to compress the archive, if file ends with `.gz` by default
+        resume: `bool` = `True`
+            Whether to resume a previous interrupted export to file
+
+    Returns
+        `int`
+            The number of exported documents
+
+    Raises
+        ValueError
+            If the export to resume doesn't match the documents anymore
+
+    """
+    if compress is None:
+        compress = file.endswith(".gz")
+
+    paths = _paths(backend, cogs)
+    progress = _load_progress(file, EXPORT) if resume else None
+
+    if progress:
+        last = None
+        for last in islice(paths, progress["paths"]):
+            pass
+        if last != progress["path"]:
+            raise ValueError(f"{file}: documents changed since interrupted export, restart it")
+
+        raw = open(file, 'r+b')
+        raw.truncate(progress["offset"])
+        raw.seek(progress["offset"])
+    else:
+        progress = {"paths": 0, "path": None, "offset": 0, "documents": 0}
+        raw = safe_open(file, 'wb')
+
+    with raw:
+        sink = _open_member(raw, compress)
+        if not progress["offset"]:
+            sink.write(ARCHIVE_HEADER)
+
+        for path, document in _read(backend, paths):
+            if document is not None: # deleted meanwhile
+                sink.write(f"{path} ".encode() + document + b"\n")
+                progress["documents"] += 1
+            progress["paths"] += 1
+            progress["path"] = path
+
+            if not progress["paths"] % CHECKPOINT_DOCUMENTS:
+                sink = _checkpoint(file, raw, sink, compress, progress)
+
+        if compress:
+            sink.close()
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    _remove_progress(file, EXPORT)
+    return progress["documents"]
+
+def import_tree(
+    backend: Backend, file: str, resume: bool = True,
+    callback: Callable[[str], None] = None
+) -> int:
+    """Writes every document of an archive made by `export_tree` to
+    backend, replacing documents with same path, in one sequential
+    pass over file, with bounded memory.
+
+    Progress is saved every `CHECKPOINT_DOCUMENTS` documents, so that
+    an interrupted import resumes where it stopped.
+
+    Parameters
+        backend: `Backend`
+            The storage to import documents to
+        file: `str`
+            The archive file location, compressed or not
+        resume: `bool` = `True`
+            Whether to resume a previous interrupted import of file
+        callback: Callable[[`str`], None] = `None`
+            The function called with the path of every imported
+            document, see `StorageEngine.changed`
+
+    Returns
+        `int`
+            The number of imported documents, including the ones
+            imported before an interruption
+
+    Raises
+        ValueError
+            If file isn't an archive, or holds a path leading
+            out of the `Cog` folders, such as `'../foo'`
+
+    """
+    progress = _load_progress(file, IMPORT) if resume else None
+    done = progress["documents"] if progress else 0
+
+    count = 0
+    for path, document in read_archive(file):
+        count += 1
+        if count <= done:
+            continue
+
+        if not _is_safe(path):
+            raise ValueError(f"{file} holds invalid document path {path!r}")
+
+        backend.write_document(path, document)
+        if callback:
+            callback(path)
+        if not count % CHECKPOINT_DOCUMENTS:
+            SYNC_SCHEDULER.sync()
+            _save_progress(file, IMPORT, {"documents": count})
+
+    SYNC_SCHEDULER.sync()
+    _remove_progress(file, IMPORT)
+    return count
+
+def read_archive(file: str) -> Iterator[Tuple[str, bytes]]:
+    """Yields the path and json document of every document of an
+    archive made by `export_tree`, compressed or not.
+    A last line left incomplete by an interrupted export is ignored.
+
+    Parameters
+        file: `str`
+            The archive file location
+
+    Raises
+        ValueError
+            If file isn't an archive
+
+    """
+    with open(file, 'rb') as f:
+        compressed = f.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+    with (gzip.open(file, 'rb') if compressed else open(file, 'rb')) as f:
+        if f.readline() != ARCHIVE_HEADER:
+            raise ValueError(f"{file} is not a config archive")
+
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+
+            path, _, document = line[:-1].partition(b" ")
+            yield path.decode(), document
+
+def _is_safe(path: str) -> bool:
+    """Returns whether path is a relative `/`-separated document
+    path, without any empty, `.` or `..` element, nor backslash.
+
+    """
+    parts = path.split("/")
+    return len(parts) > 1 and not any(part in ("", ".", "..") or "\\" in part for part in parts)
+
+def _paths(backend: Backend, cogs: Iterable[str]) -> Iterator[str]:
+    for cog in cogs:
+        yield from backend.walk(cog)
+
+def _read(backend: Backend, paths: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+    for path in paths:
+        try:
+            yield path, codec.dumps(backend.read(path))
+        except FileNotFoundError:
+            yield path, None
+
+def _open_member(raw: BinaryIO, compress: bool) -> BinaryIO:
+    # every checkpoint ends a gzip member, so that file can be truncated there
+    return gzip.GzipFile(fileobj=raw, mode='wb') if compress else raw
+
+def _checkpoint(
+    file: str, raw: BinaryIO, sink: BinaryIO, compress: bool, progress: Dict
+) -> BinaryIO:
+    if compress:
+        sink.close() # leaves raw open
+    raw.flush()
+    os.fsync(raw.fileno())
+
+    progress["offset"] = raw.tell()
+    _save_progress(file, EXPORT, progress)
+
+    return _open_member(raw, compress)
+
+def _progress_file(file: str, operation: str) -> str:
+    return f"{file}.{operation}{PROGRESS_EXTENSION}"
+
+def _load_progress(file: str, operation: str) -> Dict:
+    try:
+        with open(_progress_file(file, operation), 'rb') as f:
+            return json.loads(f.read())
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _save_progress(file: str, operation: str, progress: Dict):
+    atomic_write(_progress_file(file, operation), json.dumps(progress).encode())
+
+def _remove_progress(file: str, operation: str):
+    try:
+        os.remove(_progress_file(file, operation))
+    except FileNotFoundError:
+        pass
+
+############################################## MAIN ###############################################
+
+if __name__ == '__main__':
+    import argparse
+
+    from .storage import (
+        JsonBackend,
+        PackedBackend,
+        SqliteBackend
+    )
+
+    parser = argparse.ArgumentParser(description="Exports or imports cogs configuration archives.")
+    parser.add_argument("action", choices=(EXPORT, IMPORT))
+    parser.add_argument("file", help="archive file, gzip compressed if ending with .gz")
+    parser.add_argument("cogs", nargs="*", help="names of the cogs to export")
+    parser.add_argument("--storage", choices=("json", "packed", "sqlite"), default="json")
+    parser.add_argument("--root", default="", help="json files root directory")
+    parser.add_argument("--shards", type=int, default=0, help="json member folders shards")
+    parser.add_argument("--database", default="config.sqlite3", help="sqlite database file")
+    parser.add_argument("--restart", action="store_true", help="don't resume an interrupted run")
+    args = parser.parse_args()
+
+    if args.storage == "sqlite":
+        backend = SqliteBackend(args.database)
+    elif args.storage == "packed":
+        backend = PackedBackend(args.root)
+    else:
+        backend = JsonBackend(args.root, shards=args.shards)
+
+    if args.action == EXPORT:
+        count = export_tree(backend, args.cogs, args.file, resume=not args.restart)
+        print(f"Exported {count} documents")
+    else:
+        count = import_tree(backend, args.file, resume=not args.restart)
+        print(f"Imported {count} documents")
+    backend.close()
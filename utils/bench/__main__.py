@@ -0,0 +1,37 @@
+############################################# IMPORTS #############################################
+
+import argparse
+import json
+
+from .suite import (
+    BACKENDS,
+    GUILDS,
+    MEMBERS,
+    SAMPLES
+)
+from .suite import run
+
+############################################## MAIN ###############################################
+
+parser = argparse.ArgumentParser(
+    description="Benchmarks cogs configuration storage on synthetic guilds and members."
+)
+parser.add_argument("--guilds", type=int, default=GUILDS, help="number of guilds")
+parser.add_argument("--members", type=int, default=MEMBERS, help="number of members per guild")
+parser.add_argument("--backend", choices=BACKENDS, default="json", help="storage backend")
+parser.add_argument("--shards", type=int, default=0, help="json member folders shards")
+parser.add_argument("--samples", type=int, default=SAMPLES, help="number of member operations")
+parser.add_argument("--seed", type=int, default=0, help="population random seed")
+parser.add_argument("--output", help="file to write results to, instead of printing them")
+args = parser.parse_args()
+
+results = run(
+    guilds=args.guilds, members=args.members, backend=args.backend,
+    shards=args.shards, samples=args.samples, seed=args.seed
+)
+
+if args.output:
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+else:
+    print(json.dumps(results, indent=4))
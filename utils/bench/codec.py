@@ -0,0 +1,104 @@
+############################################# IMPORTS #############################################
+
+import json
+import os
+import random
+import tempfile
+import timeit
+
+from typing import (
+    Dict,
+    List
+)
+
+from utils import codec
+from utils.codec import (
+    Codec,
+    JsonCodec,
+    OrjsonCodec
+)
+
+############################################# GLOBALS #############################################
+
+REPEAT = 20
+
+############################################ FUNCTIONS ############################################
+
+def make_rbr_guild(rng: random.Random, combinations: int = 200) -> dict:
+    """Returns a synthetic `RoleByReaction` guild document."""
+    return {
+        "channel": rng.getrandbits(63),
+        "combinations": [
+            {"emoji": rng.choice([rng.getrandbits(63), f"emoji_{n}"]), "role": rng.getrandbits(63)}
+            for n in range(combinations)
+        ],
+        "message": rng.getrandbits(63),
+        "title": "Pick your roles!"
+    }
+
+def make_event_guild(rng: random.Random, events: int = 2000) -> dict:
+    """Returns a synthetic `Event` guild document."""
+    return {
+        "events": [
+            {
+                "channel": rng.getrandbits(63),
+                "date": 1.6e9 + rng.random() * 1e8,
+                "participants": [rng.getrandbits(63) for _ in range(rng.randint(0, 20))],
+                "title": f"event {n}"
+            }
+            for n in range(events)
+        ]
+    }
+
+def make_emoji_data(rng: random.Random, emojis: int) -> dict:
+    """Returns a synthetic `EmojiData` data mapping."""
+    return {
+        str(rng.getrandbits(63)) if n % 2 else f"emoji_{n}": {
+            "count": rng.randint(0, 100000),
+            "name": f"emoji_{n}"
+        }
+        for n in range(emojis)
+    }
+
+def make_documents() -> Dict[str, dict]:
+    rng = random.Random(0)
+    return {
+        "rbr_guild": make_rbr_guild(rng),
+        "event_guild": make_event_guild(rng),
+        "emojidata_guild": {"data": make_emoji_data(rng, 3000), "last_checked": 1.6e9},
+        "emojidata_member": make_emoji_data(rng, 100)
+    }
+
+def measure(function, *args) -> float:
+    """Returns the best time of `REPEAT` calls, in seconds."""
+    return min(timeit.repeat(lambda: function(*args), number=1, repeat=REPEAT))
+
+def write(c: Codec, file: str, data: dict):
+    with open(file, 'wb') as f:
+        c.dump(data, f)
+
+def read(c: Codec, file: str) -> dict:
+    with open(file, 'rb') as f:
+        return c.load(f)
+
+def run() -> Dict[str, dict]:
+    codecs: List[Codec] = [JsonCodec()]
+    if codec.orjson:
+        codecs.append(OrjsonCodec())
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        file = os.path.join(directory, "document.json")
+        for shape, data in make_documents().items():
+            results[shape] = {"bytes": len(json.dumps(data))}
+            for c in codecs:
+                assert c.loads(c.dumps(data)) == data
+                results[shape][f"{c.name}_write"] = measure(write, c, file, data)
+                results[shape][f"{c.name}_read"] = measure(read, c, file)
+
+    return results
+
+############################################## MAIN ###############################################
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=4))
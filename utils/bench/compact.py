@@ -0,0 +1,85 @@
+############################################# IMPORTS #############################################
+
+import json
+import random
+import tracemalloc
+
+from typing import (
+    Callable,
+    List
+)
+
+from Birthday.data import (
+    Date,
+    Member
+)
+from utils.objectify import Objectify
+
+############################################# GLOBALS #############################################
+
+MEMBERS = 100000
+
+############################################# CLASSES #############################################
+
+class LooseDate(Objectify):
+    day: int
+    month: int
+
+    def __init__(self, day: int, month: int):
+        super().__init__(day=day, month=month)
+
+class LooseMember(Objectify):
+    birthday: LooseDate
+    name: str
+
+    def __init__(self, birthday: LooseDate, name: str):
+        super().__init__(birthday=birthday, name=name)
+
+############################################ FUNCTIONS ############################################
+
+def make_members(members: int = MEMBERS) -> List[dict]:
+    """Returns synthetic `Birthday` member documents."""
+    rng = random.Random(0)
+    return [
+        {
+            "birthday": {"day": rng.randint(1, 28), "month": rng.randint(1, 12)},
+            "name": f"member{n}"
+        }
+        for n in range(members)
+    ]
+
+def measure(build: Callable[[], list]) -> int:
+    """Returns the memory held by what build returns, in bytes."""
+    tracemalloc.start()
+    data = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del data
+
+    return size
+
+def run(members: int = MEMBERS) -> dict:
+    documents = make_members(members)
+
+    loose = measure(lambda: [
+        LooseMember(birthday=LooseDate(**d["birthday"]), name=d["name"])
+        for d in documents
+    ])
+    compact = measure(lambda: [
+        Member(birthday=Date(**d["birthday"]), name=d["name"])
+        for d in documents
+    ])
+
+    return {
+        "members": members,
+        "loose_bytes": loose,
+        "compact_bytes": compact,
+        "loose_bytes_per_member": loose / members,
+        "compact_bytes_per_member": compact / members,
+        "reduction": 1 - compact / loose
+    }
+
+############################################## MAIN ###############################################
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=4))
@@ -0,0 +1,106 @@
+############################################# IMPORTS #############################################
+
+import json
+import random
+import re
+import timeit
+
+from collections import Counter
+from emoji import (
+    EMOJI_DATA,
+    demojize,
+    emojize
+)
+from typing import (
+    List,
+    Tuple
+)
+
+from EmojiData.matcher import MATCHER
+
+############################################# GLOBALS #############################################
+
+MESSAGES = 20000
+REPEAT = 5
+
+WORDS = (
+    "the", "a", "you", "i", "is", "it", "that", "lol", "gg", "ok", "yes", "no", "what",
+    "tonight", "game", "anyone", "wanna", "play", "see", "at", "9pm", "#general", "2",
+    ":)", "<3", "xD", "https://discord.gg/abc", "@everyone", "**bold**", "`code`"
+)
+# most used unicode emojis, weighting them so the corpus looks like chat
+COMMON_EMOJIS = ("😂", "❤️", "👍", "😭", "🔥", "😊", "🙏", "👀", "💀", "🥺", "👍🏽", "1️⃣")
+
+FIND_CUSTOM_EMOJIS = re.compile(r"(?<=<:)\w+:\d+(?=>)").findall
+FIND_EMOJIS = re.compile(r"(?<=:)\w+(?=:)").findall
+
+############################################ FUNCTIONS ############################################
+
+def make_messages(messages: int = MESSAGES, seed: int = 0) -> List[str]:
+    """Returns synthetic chat messages, a third of them with emojis,
+    custom ones included.
+
+    """
+    rng = random.Random(seed)
+    emojis = list(EMOJI_DATA)
+    customs = [f"<:emote_{n}:{rng.getrandbits(60)}>" for n in range(50)]
+
+    corpus = []
+    for _ in range(messages):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 25))]
+        if rng.random() < 0.33:
+            for _ in range(rng.randint(1, 4)):
+                roll = rng.random()
+                if roll < 0.5:
+                    emoji = rng.choice(COMMON_EMOJIS)
+                elif roll < 0.8:
+                    emoji = rng.choice(customs)
+                else:
+                    emoji = rng.choice(emojis)
+                words.insert(rng.randint(0, len(words)), emoji)
+        corpus.append(" ".join(words))
+
+    return corpus
+
+def reference_find(text: str) -> List[Tuple[str, str]]:
+    """Demojize and emojize per candidate extraction, as done before `EmojiMatcher`."""
+    custom_emojis = [tuple(e.split(":")) for e in FIND_CUSTOM_EMOJIS(text)]
+
+    text = demojize(text)
+    casual_emojis = FIND_EMOJIS(text)
+    casual_emojis = [(e, e) for e in casual_emojis if f":{e}:" != emojize(f":{e}:")]
+
+    return custom_emojis + casual_emojis
+
+def measure(function, corpus: List[str]) -> float:
+    """Returns the best time of `REPEAT` passes over corpus, in seconds."""
+    return min(timeit.repeat(lambda: [function(text) for text in corpus], number=1, repeat=REPEAT))
+
+def run(messages: int = MESSAGES) -> dict:
+    corpus = make_messages(messages)
+
+    # the reference misses emojis with names that aren't words, like 'thumbs_up_medium_skin_tone'
+    found = missed = 0
+    for text in corpus:
+        emojis = Counter(MATCHER.find(text))
+        reference = Counter(reference_find(text))
+        assert not reference - emojis, text
+        found += sum(emojis.values())
+        missed += sum((emojis - reference).values())
+
+    results = {
+        "messages": messages,
+        "emojis": found,
+        "reference_missed_emojis": missed,
+        "find": measure(MATCHER.find, corpus),
+        "reference_find": measure(reference_find, corpus),
+    }
+    results["messages_per_second"] = messages / results["find"]
+    results["speedup"] = results["reference_find"] / results["find"]
+
+    return results
+
+############################################## MAIN ###############################################
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=4))
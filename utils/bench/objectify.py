@@ -0,0 +1,108 @@
+############################################# IMPORTS #############################################
+
+import json
+import random
+import timeit
+
+from typing import (
+    List,
+    Tuple,
+    Type
+)
+
+from Event.data import (
+    Event,
+    Guild
+)
+from utils.objectify import Objectify
+from utils.objectify import (
+    dictify,
+    objectify
+)
+from utils.utils import (
+    isofclass,
+    isoftype
+)
+
+############################################# GLOBALS #############################################
+
+EVENTS = 10000
+REPEAT = 5
+
+############################################ FUNCTIONS ############################################
+
+def make_guild(events: int = EVENTS) -> dict:
+    """Returns a synthetic `Event` guild document."""
+    rng = random.Random(0)
+    return {
+        "events": [
+            {
+                "channel": rng.getrandbits(63),
+                "date": 1.6e9 + rng.random() * 1e8,
+                "participants": [rng.getrandbits(63) for _ in range(rng.randint(0, 5))],
+                "title": f"event {n}"
+            }
+            for n in range(events)
+        ]
+    }
+
+def reference_objectify(iterable: dict, cls: Type[Objectify]) -> Objectify:
+    """Annotations walking conversion, as done before converters."""
+    if isinstance(iterable, (list, tuple))\
+       and isofclass(cls, (List[Objectify], Tuple[Objectify])):
+        return [reference_objectify(x, cls.__args__[0]) for x in iterable]
+
+    args = {}
+    for arg, c in cls.__annotations__.items():
+        if isofclass(c, Objectify):
+            args[arg] = reference_objectify(iterable[arg], c)
+        elif isofclass(c, (List[Objectify], Tuple[Objectify])):
+            args[arg] = [reference_objectify(x, c.__args__[0]) for x in iterable[arg]]
+        else:
+            args[arg] = iterable[arg]
+
+    return cls(**args)
+
+def reference_dictify(value: Objectify) -> dict:
+    """Runtime type checking conversion, as done before converters."""
+    d = {}
+    for key, v in value.items():
+        if isinstance(v, Objectify):
+            d[key] = reference_dictify(v)
+        elif isoftype(v, (List[Objectify], Tuple[Objectify])):
+            d[key] = [reference_dictify(x) for x in v]
+        else:
+            d[key] = v
+
+    return d
+
+def measure(function, *args) -> float:
+    """Returns the best time of `REPEAT` calls, in seconds."""
+    return min(timeit.repeat(lambda: function(*args), number=1, repeat=REPEAT))
+
+def run(events: int = EVENTS) -> dict:
+    document = make_guild(events)
+    guild = objectify(document, Guild)
+    lazy_guild = objectify(document, Guild, lazy=True)
+
+    assert dictify(guild) == reference_dictify(guild) == document
+    assert dictify(lazy_guild) == document
+
+    results = {
+        "events": events,
+        "objectify": measure(objectify, document, Guild),
+        "reference_objectify": measure(reference_objectify, document, Guild),
+        "dictify": measure(dictify, guild),
+        "reference_dictify": measure(reference_dictify, guild),
+        "lazy_objectify": measure(objectify, document, Guild, True),
+        "lazy_dictify": measure(dictify, lazy_guild),
+    }
+    results["objectify_speedup"] = results["reference_objectify"] / results["objectify"]
+    results["dictify_speedup"] = results["reference_dictify"] / results["dictify"]
+
+    return results
+
+############################################## MAIN ###############################################
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=4))
@@ -0,0 +1,72 @@
+############################################# IMPORTS #############################################
+
+import json
+import os
+import random
+import tempfile
+import time
+
+from typing import (
+    Callable,
+    Dict
+)
+
+from utils.storage import (
+    SYNC_SCHEDULER,
+    JsonBackend
+)
+
+############################################# GLOBALS #############################################
+
+MEMBERS = 20000
+READS = 2000
+SHARDS = 256
+
+FOLDER = "Bench/member/1"
+
+############################################ FUNCTIONS ############################################
+
+def measure(function: Callable, *args) -> float:
+    """Returns the time a single call takes, in seconds."""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def fill(backend: JsonBackend, members: int):
+    for n in range(members):
+        backend.write(f"{FOLDER}/{n * 7919}", {"birthday": {"day": 1, "month": 1}, "name": str(n)})
+    SYNC_SCHEDULER.sync()
+
+def read(backend: JsonBackend, names: list):
+    for name in names:
+        backend.read(f"{FOLDER}/{name}")
+
+def run_layout(shards: int, members: int = MEMBERS) -> Dict[str, float]:
+    rng = random.Random(0)
+    names = [str(rng.randrange(members) * 7919) for _ in range(READS)]
+
+    with tempfile.TemporaryDirectory() as root:
+        results = {"fill": measure(fill, JsonBackend(root, shards=shards), members)}
+
+        # listing a folder without manifest, by scanning directories
+        os.remove(os.path.join(root, FOLDER, ".manifest"))
+        results["scan_listing"] = measure(JsonBackend(root, shards=shards).list, FOLDER)
+
+        # listing a folder from its manifest
+        results["manifest_listing"] = measure(JsonBackend(root, shards=shards).list, FOLDER)
+
+        results["random_reads"] = measure(read, JsonBackend(root, shards=shards), names)
+
+    return results
+
+def run(members: int = MEMBERS) -> Dict[str, Dict[str, float]]:
+    return {
+        "members": members,
+        "flat": run_layout(0, members),
+        f"{SHARDS}_shards": run_layout(SHARDS, members)
+    }
+
+############################################## MAIN ###############################################
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=4))
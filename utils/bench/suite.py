@@ -0,0 +1,314 @@
+############################################# IMPORTS #############################################
+
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Tuple
+)
+
+try:
+    import resource
+except ImportError: # not available on Windows
+    resource = None
+
+from Birthday.data import (
+    Date,
+    Guild as BirthdayGuild,
+    Member as BirthdayMember
+)
+from Event.data import Guild as EventGuild
+from RoleByReaction.data import Guild as RoleByReactionGuild
+from utils.bench.codec import (
+    make_emoji_data,
+    make_event_guild,
+    make_rbr_guild
+)
+from utils.config import Config
+from utils.engine import StorageEngine
+from utils.storage import (
+    SYNC_SCHEDULER,
+    Backend,
+    JsonBackend,
+    PackedBackend,
+    SqliteBackend
+)
+
+############################################# GLOBALS #############################################
+
+GUILDS = 20
+MEMBERS = 200
+SAMPLES = 1000
+FLUSH_BATCH = 100
+
+BACKENDS = ("json", "packed", "sqlite")
+
+############################################# CLASSES #############################################
+
+class Population:
+    """Synthetic configuration documents of the Birthday, EmojiData,
+    RoleByReaction and Event cogs, for guilds guilds of members
+    members each.
+
+    Parameters
+        guilds: `int`
+            The number of guilds
+        members: `int`
+            The number of members per guild
+        seed: `int` = `0`
+            The random generator seed, so that populations are
+            the same from one run to another
+
+    """
+    COGS = ("Birthday", "EmojiData", "RoleByReaction", "Event")
+    MEMBER_COGS = ("Birthday", "EmojiData")
+
+    def __init__(self, guilds: int, members: int, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.guild_ids = [self.rng.getrandbits(63) for _ in range(guilds)]
+        self.member_ids = {
+            guild_id: [self.rng.getrandbits(63) for _ in range(members)]
+            for guild_id in self.guild_ids
+        }
+
+    def guild(self, cog: str) -> dict:
+        if cog == "Birthday":
+            return {"channel": self.rng.getrandbits(63), "role": self.rng.getrandbits(63)}
+        elif cog == "EmojiData":
+            return {"data": make_emoji_data(self.rng, 300), "last_checked": 1.6e9}
+        elif cog == "RoleByReaction":
+            return make_rbr_guild(self.rng, 20)
+        else:
+            return make_event_guild(self.rng, 200)
+
+    def member(self, cog: str) -> dict:
+        if cog == "Birthday":
+            return {
+                "birthday": {"day": self.rng.randint(1, 28), "month": self.rng.randint(1, 12)},
+                "name": f"member {self.rng.getrandbits(16)}"
+            }
+        else:
+            return make_emoji_data(self.rng, 20)
+
+    def fill(self, backend: Backend):
+        """Writes every document of the population to backend."""
+        for cog in self.COGS:
+            for guild_id in self.guild_ids:
+                backend.write(f"{cog}/guild/{guild_id}", self.guild(cog))
+
+        for cog in self.MEMBER_COGS:
+            for guild_id, member_ids in self.member_ids.items():
+                for member_id in member_ids:
+                    backend.write(f"{cog}/member/{guild_id}/{member_id}", self.member(cog))
+
+        SYNC_SCHEDULER.sync()
+
+    def sample(self, samples: int) -> List[Tuple[str, int, int]]:
+        """Returns samples random (cog, guild id, member id) triplets."""
+        return [
+            (
+                self.rng.choice(self.MEMBER_COGS),
+                guild_id := self.rng.choice(self.guild_ids),
+                self.rng.choice(self.member_ids[guild_id])
+            )
+            for _ in range(samples)
+        ]
+
+############################################ FUNCTIONS ############################################
+
+def make_backend(name: str, root: str, shards: int = 0) -> Backend:
+    if name == "sqlite":
+        return SqliteBackend(os.path.join(root, "config.sqlite3"))
+    elif name == "packed":
+        return PackedBackend(root)
+    else:
+        return JsonBackend(root, shards=shards)
+
+def make_configs(storage: StorageEngine) -> Dict[str, Config]:
+    """Returns a `Config` per cog, with the same defaults as the cogs."""
+    def cog(name: str) -> Any:
+        return type(name, (), {})()
+
+    return {
+        "Birthday": Config(
+            cog("Birthday"), storage=storage,
+            guild=BirthdayGuild(channel=0, role=0),
+            member=BirthdayMember(birthday=Date(day=None, month=None), name="Unknown")
+        ),
+        "EmojiData": Config(
+            cog("EmojiData"), storage=storage,
+            guild={"data": {}, "last_checked": 1420066800.0}, member={}
+        ),
+        "RoleByReaction": Config(
+            cog("RoleByReaction"), storage=storage,
+            guild=RoleByReactionGuild(channel=0, combinations=[], message=0, title="")
+        ),
+        "Event": Config(
+            cog("Event"), storage=storage, lazy=True,
+            guild=EventGuild(events=[])
+        )
+    }
+
+def time_calls(calls: List[Callable[[], Any]]) -> Dict[str, float]:
+    """Calls every function of calls and returns their latency statistics.
+
+    Returns
+        Dict[`str`, `float`]
+            The number of calls, the calls per second,
+            and the 50th and 99th percentiles latencies in milliseconds
+
+    """
+    latencies = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    return {
+        "count": len(latencies),
+        "ops_per_sec": len(latencies) / sum(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000
+    }
+
+def time_syncs(calls: List[Callable[[], Any]]) -> Dict[str, float]:
+    """Same as `time_calls`, along with the number of synchronization
+    rounds and `os.fsync` calls the calls made, see `SyncScheduler`.
+
+    """
+    rounds, fsyncs = SYNC_SCHEDULER.rounds, SYNC_SCHEDULER.fsyncs
+    results = time_calls(calls)
+    SYNC_SCHEDULER.sync()
+    results["sync_rounds"] = SYNC_SCHEDULER.rounds - rounds
+    results["fsyncs"] = SYNC_SCHEDULER.fsyncs - fsyncs
+    return results
+
+def percentile(latencies: List[float], q: float) -> float:
+    """Returns the q-quantile of sorted latencies."""
+    if not latencies:
+        return 0.0
+    return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+def peak_rss() -> int:
+    """Returns the peak resident set size of the process, in kilobytes."""
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if platform.system() == "Darwin" else peak # bytes on macOS
+
+def commit() -> str:
+    """Returns the current git commit, if any, so that results can
+    be told apart across commits.
+
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=os.path.dirname(__file__)
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+def run(
+    guilds: int = GUILDS, members: int = MEMBERS, backend: str = "json",
+    shards: int = 0, samples: int = SAMPLES, seed: int = 0
+) -> Dict[str, Any]:
+    """Runs the whole suite on a fresh population, in a temporary directory.
+
+    Every read operation is timed on a cold cache, and every write
+    operation includes writing back to backend.
+
+    """
+    population = Population(guilds, members, seed)
+
+    with tempfile.TemporaryDirectory() as root:
+        storage = StorageEngine(make_backend(backend, root, shards))
+        configs = make_configs(storage)
+
+        start = time.perf_counter()
+        population.fill(storage.backend)
+        fill = time.perf_counter() - start
+
+        guild_ids = population.guild_ids
+        member_keys = population.sample(samples)
+        operations = {}
+
+        storage.cache.evict()
+        operations["guild"] = time_calls([
+            lambda c=config, g=guild_id: c.guild_from_id(g).get()
+            for config in configs.values()
+            for guild_id in guild_ids
+        ])
+
+        storage.cache.evict()
+        operations["member"] = time_calls([
+            lambda c=configs[cog], g=guild_id, m=member_id: c.member_from_ids(g, m).get()
+            for cog, guild_id, member_id in member_keys
+        ])
+
+        storage.cache.evict()
+        operations["all_members"] = time_calls([
+            lambda c=configs[cog], g=guild_id: c.all_members_with_guild_id(g, prefetch=True)
+            for cog in Population.MEMBER_COGS
+            for guild_id in guild_ids
+        ])
+
+        groups = [configs[cog].member_from_ids(g, m) for cog, g, m in member_keys]
+        for group in groups:
+            group.get()
+
+        def set_member(group):
+            group.set(group.get())
+            storage.cache.flush(group.path)
+
+        operations["set"] = time_syncs([partial(set_member, group) for group in groups])
+
+        def flush_members(batch):
+            for group in batch:
+                group.set(group.get())
+            storage.cache.flush()
+
+        # same writes, flushed FLUSH_BATCH at once
+        operations["flush"] = time_syncs([
+            partial(flush_members, groups[n:n + FLUSH_BATCH])
+            for n in range(0, len(groups), FLUSH_BATCH)
+        ])
+
+        def clear_members(config, guild_id):
+            config.clear_members_with_guild_id(guild_id)
+            storage.cache.flush(f"{config.cog}/member/{guild_id}/")
+
+        operations["clear_members"] = time_calls([
+            partial(clear_members, configs[cog], guild_id)
+            for cog in Population.MEMBER_COGS
+            for guild_id in guild_ids
+        ])
+
+        stats = storage.stats()
+        storage.close()
+
+    return {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "backend": backend,
+        "shards": shards,
+        "guilds": guilds,
+        "members": members,
+        "documents": len(Population.COGS) * guilds + len(Population.MEMBER_COGS) * guilds * members,
+        "fill_seconds": fill,
+        "operations": operations,
+        "storage": stats,
+        "peak_rss_kb": peak_rss()
+    }
@@ -0,0 +1,445 @@
+############################################# IMPORTS #############################################
+
+import asyncio
+import threading
+
+from asyncio import AbstractEventLoop
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Set
+)
+
+############################################# GLOBALS #############################################
+
+COMPACT_THRESHOLD = 64
+FLUSH_INTERVAL = 10.0
+FLUSH_WORKERS = 16
+
+############################################# CLASSES #############################################
+
+class Cache:
+    """A write-back cache of configuration files, keyed by file path.
+
+    Repeated lookups of the same path return the very same parsed
+    object. Setting an entry only marks it as dirty: dirty entries
+    are written back on `Cache.flush`, which is called periodically
+    once `Cache.start` has been called, on `Cog` unload and at
+    interpreter shutdown. Dirty entries are written back
+    concurrently, so that their writes are synchronized together.
+
+    If max_entries is set, least recently used entries without
+    pending changes are dropped whenever there are more entries.
+
+    Entries can also record partial updates with `Cache.patch`, which
+    are written back through patcher instead of a full rewrite, until
+    patcher reports more than `COMPACT_THRESHOLD` pending operations
+    for the path, in which case the entry is fully rewritten on next
+    flush.
+
+    Parameters
+        writer: Callable[[`str`, Any], None]
+            The function used to persist an entry to its path
+        awriter: Callable[[`str`, Any], Awaitable[None]] = `None`
+            The coroutine function used to persist an entry without
+            blocking the event loop, used by `Cache.aflush`
+        patcher: Callable[[`str`, List[`str`]], `int`] = `None`
+            The function used to persist partial updates of an entry,
+            returning the number of operations not compacted yet
+        apatcher: Callable[[`str`, List[`str`]], Awaitable[`int`]] = `None`
+            The coroutine function equivalent of patcher
+        max_entries: `int` = `None`
+            The number of entries to keep at most, if possible
+
+    """
+    def __init__(
+        self, writer: Callable[[str, Any], None],
+        awriter: Callable[[str, Any], Awaitable[None]] = None,
+        patcher: Callable[[str, List[str]], int] = None,
+        apatcher: Callable[[str, List[str]], Awaitable[int]] = None,
+        max_entries: int = None
+    ):
+        self.writer = writer
+        self.awriter = awriter
+        self.patcher = patcher
+        self.apatcher = apatcher
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._data: Dict[str, Any] = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._ops: Dict[str, List[str]] = {}
+        self._versions: Dict[str, int] = {}
+        self._committing: Dict[str, int] = {}
+        self._held: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._task: asyncio.Task = None
+
+    def __contains__(self, path: str) -> bool:
+        """Returns path in self"""
+        return path in self._data
+
+    def __len__(self) -> int:
+        """Returns len(self)"""
+        return len(self._data)
+
+    def get(self, path: str, loader: Callable[[], Any]) -> Any:
+        """Returns the cached data of path, calling loader to fill
+        the entry on first lookup.
+
+        Parameters
+            path: `str`
+                The path of the cached file
+            loader: Callable[[], Any]
+                The function returning the data of path if not cached
+
+        Returns
+            Any
+                The cached data
+
+        """
+        with self._lock:
+            try:
+                data = self._data[path]
+            except KeyError:
+                self.misses += 1
+                data = self._data[path] = loader()
+                self._trim()
+            else:
+                self.hits += 1
+                self._data.move_to_end(path)
+
+            return data
+
+    def set(self, path: str, data: Any, dirty: bool = True):
+        """Replaces the cached data of path.
+
+        Parameters
+            path: `str`
+                The path of the cached file
+            data: Any
+                The new data
+            dirty: `bool` = `True`
+                Whether data still has to be written back or not
+
+        """
+        with self._lock:
+            self._data[path] = data
+            self._data.move_to_end(path)
+            self._ops.pop(path, None)
+            if dirty:
+                self._dirty.add(path)
+                self._versions[path] = self._versions.get(path, 0) + 1
+            else:
+                self._dirty.discard(path)
+                self._trim()
+
+    def patch(self, path: str, op: str):
+        """Records a partial update of path entry, which data must
+        already have been updated accordingly.
+
+        Parameters
+            path: `str`
+                The path of the cached file
+            op: `str`
+                The serialized operation
+
+        """
+        with self._lock:
+            if not self.patcher or path in self._dirty:
+                # pending rewrite includes it, unless already being written
+                self._dirty.add(path)
+                self._versions[path] = self._versions.get(path, 0) + 1
+            else:
+                self._ops.setdefault(path, []).append(op)
+
+    def _trim(self):
+        """Drops least recently used entries without pending changes,
+        until there are no more than `self.max_entries` entries.
+
+        """
+        if self.max_entries is None:
+            return
+
+        for path in list(self._data):
+            if len(self._data) <= self.max_entries:
+                break
+            if not self.is_dirty(path) and not self.is_held(path):
+                del self._data[path]
+
+    def is_dirty(self, path: str) -> bool:
+        """Returns whether path has pending changes, or changes being
+        written back, or not.
+
+        """
+        return path in self._dirty or path in self._ops or path in self._committing
+
+    def dirty(self, prefix: str = "") -> List[str]:
+        """Returns the paths with pending changes starting with prefix."""
+        return [p for p in self._dirty.union(self._ops) if p.startswith(prefix)]
+
+    def batch(self, prefix: str = "") -> "Batch":
+        """Returns a context manager holding back writes of every path
+        starting with prefix until it exits, see `Batch`.
+
+        Parameters
+            prefix: `str` = `""`
+                The paths prefix to aim for, every entry if empty
+
+        """
+        return Batch(self, prefix)
+
+    def hold(self, prefix: str):
+        """Holds back writes of paths starting with prefix,
+        until as many `Cache.release` calls are made.
+
+        """
+        with self._lock:
+            self._held[prefix] = self._held.get(prefix, 0) + 1
+
+    def release(self, prefix: str):
+        """Cancels a `Cache.hold` call."""
+        with self._lock:
+            self._held[prefix] -= 1
+            if not self._held[prefix]:
+                del self._held[prefix]
+
+    def is_held(self, path: str) -> bool:
+        """Returns whether writes of path are held back or not."""
+        return any(path.startswith(prefix) for prefix in self._held)
+
+    def drop(self, path: str, discard: bool = False) -> bool:
+        """Drops path entry without writing it back, so that it is
+        loaded again on next lookup, unless it has pending changes.
+
+        Parameters
+            path: `str`
+                The path of the cached file
+            discard: `bool` = `False`
+                Whether to drop the entry along with its pending
+                changes, if any
+
+        Returns
+            `bool`
+                Whether the entry was dropped or not
+
+        """
+        with self._lock:
+            if discard:
+                self._dirty.discard(path)
+                self._ops.pop(path, None)
+            elif self.is_dirty(path):
+                return False
+
+            self._data.pop(path, None)
+            return True
+
+    def evict(self, prefix: str = ""):
+        """Writes back then drops every entry which path starts with prefix.
+
+        Parameters
+            prefix: `str` = `""`
+                The paths prefix to aim for, every entry if empty
+
+        """
+        with self._lock:
+            self.flush(prefix)
+            for path in [p for p in self._data if p.startswith(prefix)]:
+                del self._data[path]
+
+    def flush(self, prefix: str = ""):
+        """Writes back every dirty entry which path starts with prefix.
+
+        Parameters
+            prefix: `str` = `""`
+                The paths prefix to aim for, every entry if empty
+
+        """
+        with self._lock:
+            paths = [path for path in self.dirty(prefix) if not self.is_held(path)]
+            rewrites = [path for path in paths if path in self._dirty]
+
+            if len(rewrites) > 1:
+                with ThreadPoolExecutor(min(len(rewrites), FLUSH_WORKERS)) as executor:
+                    errors = list(executor.map(self._rewrite, rewrites))
+            else:
+                errors = [self._rewrite(path) for path in rewrites]
+
+            for path, error in zip(rewrites, errors):
+                if error is None:
+                    self._dirty.discard(path)
+                    self._ops.pop(path, None)
+
+            for path in paths:
+                if path not in self._dirty and path in self._ops:
+                    ops = self._ops.pop(path)
+                    try:
+                        pending = self.patcher(path, ops)
+                    except Exception:
+                        self._ops[path] = ops + self._ops.get(path, [])
+                        raise
+
+                    if pending > COMPACT_THRESHOLD:
+                        self._dirty.add(path)
+
+            self._trim()
+
+            for error in errors:
+                if error is not None:
+                    raise error
+
+    def _rewrite(self, path: str) -> Exception:
+        """Writes path entry with `self.writer`, returning the error
+        raised if any, so that others are still written.
+
+        """
+        try:
+            self.writer(path, self._data[path])
+        except Exception as error:
+            return error
+
+    async def aflush(self, prefix: str = ""):
+        """Same as `Cache.flush`, but awaits `self.awriter` instead,
+        falling back to `self.writer` if not provided, for every
+        dirty entry at once.
+
+        Parameters
+            prefix: `str` = `""`
+                The paths prefix to aim for, every entry if empty
+
+        """
+        results = await asyncio.gather(
+            *(self.acommit(path) for path in self.dirty(prefix)),
+            return_exceptions=True
+        )
+
+        with self._lock:
+            self._trim()
+
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    async def acommit(self, path: str):
+        """Writes back path entry if dirty, awaiting `self.awriter`
+        if provided.
+
+        The entry is only marked clean once written back, and only if
+        it wasn't set again meanwhile, so that it can't be dropped
+        before, nor its changes lost if writing fails.
+
+        Parameters
+            path: `str`
+                The path of the cached file
+
+        """
+        if self.is_held(path):
+            return
+
+        self._committing[path] = self._committing.get(path, 0) + 1
+        try:
+            if path in self._dirty:
+                version = self._versions.get(path)
+                if self.awriter:
+                    await self.awriter(path, self._data[path])
+                else:
+                    self.writer(path, self._data[path])
+
+                if self._versions.get(path) == version:
+                    self._dirty.discard(path)
+                    self._ops.pop(path, None)
+
+            elif path in self._ops:
+                ops = self._ops.pop(path)
+                try:
+                    if self.apatcher:
+                        pending = await self.apatcher(path, ops)
+                    else:
+                        pending = self.patcher(path, ops)
+                except Exception:
+                    self._ops[path] = ops + self._ops.get(path, [])
+                    raise
+
+                if pending > COMPACT_THRESHOLD:
+                    self._dirty.add(path)
+        finally:
+            self._committing[path] -= 1
+            if not self._committing[path]:
+                del self._committing[path]
+
+    def start(self, loop: AbstractEventLoop, interval: float = FLUSH_INTERVAL):
+        """Starts flushing dirty entries every interval seconds on loop.
+
+        Parameters
+            loop: `AbstractEventLoop`
+                The loop to run the flushing task on
+            interval: `float` = `FLUSH_INTERVAL`
+                The time between two flushes, in seconds
+
+        """
+        self.stop()
+        self._task = loop.create_task(self._flusher(interval))
+
+    def stop(self):
+        """Stops the periodic flushing task, if started."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _flusher(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            # written concurrently, one path failing mustn't keep others from being written
+            paths = self.dirty()
+            results = await asyncio.gather(
+                *(self.acommit(path) for path in paths),
+                return_exceptions=True
+            )
+            for path, result in zip(paths, results):
+                if isinstance(result, Exception):
+                    print(f"CACHE: flush of {path} failed: {result!r}")
+
+            with self._lock:
+                self._trim()
+
+class Batch:
+    """Holds back writes of the cached paths starting with prefix,
+    for as long as the context is entered, then writes them back
+    at once on exit, so that any number of changes to a same path
+    only costs a single write.
+
+    Supports both `with` and `async with` statements, the latter
+    writing back without blocking the event loop.
+
+    Parameters
+        cache: `Cache`
+            The cache to hold back writes of
+        prefix: `str`
+            The paths prefix to aim for
+
+    """
+    def __init__(self, cache: Cache, prefix: str):
+        self.cache = cache
+        self.prefix = prefix
+
+    def __enter__(self) -> "Batch":
+        self.cache.hold(self.prefix)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cache.release(self.prefix)
+        self.cache.flush(self.prefix)
+
+    async def __aenter__(self) -> "Batch":
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info):
+        self.cache.release(self.prefix)
+        await self.cache.aflush(self.prefix)
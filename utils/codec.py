@@ -0,0 +1,121 @@
+############################################# IMPORTS #############################################
+
+import json
+
+from typing import (
+    Any,
+    BinaryIO,
+    Union
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+############################################# CLASSES #############################################
+
+class Codec:
+    """Base class of json encoders/decoders used to store
+    configuration documents.
+
+    Documents are encoded to and decoded from `bytes`, so that files
+    can be read and written in binary mode, without any intermediate
+    `str` copy of the whole document when the codec allows it.
+
+    """
+    name = None
+
+    def dumps(self, data: Any) -> bytes:
+        """Encodes json-like data.
+
+        Parameters
+            data: Union[`list`, `dict`]
+                The json-like data to encode
+
+        Returns
+            `bytes`
+                The utf-8 encoded json document
+
+        """
+        raise NotImplementedError
+
+    def loads(self, document: Union[bytes, str]) -> Any:
+        """Decodes a json document.
+
+        Parameters
+            document: Union[`bytes`, `str`]
+                The json document to decode
+
+        Returns
+            Union[`list`, `dict`]
+                The decoded json-like data
+
+        """
+        raise NotImplementedError
+
+    def dump(self, data: Any, file: BinaryIO):
+        """Same as `Codec.dumps`, but writes to a binary file."""
+        file.write(self.dumps(data))
+
+    def load(self, file: BinaryIO) -> Any:
+        """Same as `Codec.loads`, but reads from a binary file."""
+        return self.loads(file.read())
+
+class JsonCodec(Codec):
+    """Standard library `json` codec, always available."""
+    name = "json"
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data).encode()
+
+    def loads(self, document: Union[bytes, str]) -> Any:
+        return json.loads(document)
+
+class OrjsonCodec(Codec):
+    """`orjson` codec, much faster than `json` and encoding
+    directly to `bytes`. Non-`str` keys are converted to `str`,
+    just like `json` does.
+
+    """
+    name = "orjson"
+
+    def dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, document: Union[bytes, str]) -> Any:
+        return orjson.loads(document)
+
+############################################# GLOBALS #############################################
+
+CODEC: Codec = OrjsonCodec() if orjson else JsonCodec()
+
+############################################ FUNCTIONS ############################################
+
+def set_codec(codec: Codec):
+    """Replaces the codec used to encode and decode every
+    configuration document.
+
+    Parameters
+        codec: `Codec`
+            The new codec
+
+    """
+    global CODEC
+    CODEC = codec
+
+def dumps(data: Any) -> bytes:
+    """Encodes data with current codec, see `Codec.dumps`."""
+    return CODEC.dumps(data)
+
+def loads(document: Union[bytes, str]) -> Any:
+    """Decodes document with current codec, see `Codec.loads`."""
+    return CODEC.loads(document)
+
+def dump(data: Any, file: BinaryIO):
+    """Encodes data to file with current codec, see `Codec.dump`."""
+    CODEC.dump(data, file)
+
+def load(file: BinaryIO) -> Any:
+    """Decodes file with current codec, see `Codec.load`."""
+    return CODEC.load(file)
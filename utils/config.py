@@ -10,17 +10,47 @@ from discord.abc import GuildChannel
 from discord.ext.commands import Cog
 
 ##################### UTILS #####################
-import errno
-import json
-import os
+import time
+
+from contextlib import asynccontextmanager
+from copy import deepcopy
+from functools import partial
+from inspect import isawaitable
 from typing import (
     Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
     Dict,
     List,
-    Type,
+    Sequence,
     Union
 )
 
+from .cache import Batch
+from .engine import StorageEngine
+from .metrics import (
+    EDIT,
+    GET,
+    GET_ALL,
+    SET
+)
+from .storage import (
+    Backend,
+    JsonBackend,
+    PackedBackend,
+    SqliteBackend
+)
+from .storage import (
+    EXECUTOR,
+    APPEND,
+    UPDATE,
+    apply_op,
+    awrite,
+    dump_op,
+    load,
+    write
+)
 from .objectify import Objectify
 from .objectify import (
     dictify,
@@ -36,26 +66,51 @@ from .objectify import (
 class Group:
     """Represents a single configuration file.
 
+    File data is kept in the cache of storage, so every `Group`
+    of a same file shares the same data, and changes are only written
+    back to storage backend when the cache is flushed.
+    File is only read on first access, and `Group.aget`/`Group.aset`
+    perform any file I/O on `EXECUTOR` instead of the event loop.
+
     Parameters
-        file: `str`
-            The path to config file
+        path: `str`
+            The path to config file, without extension
         defaults: Union[`list`, Dict[`str`, Any], List[`Objectify`], `Objectify`] = `{}`
             The default value if file doesn't exist
+        storage: `StorageEngine`
+            The storage engine the file belongs to
+        lazy: `bool` = `False`
+            Whether lists of `Objectify` are loaded as `LazyList`,
+            converting their elements on first access only
 
     """
     def __init__(
-        self, file: str, defaults: JSON_like = Objectify(),
+        self, path: str, defaults: JSON_like = Objectify(), *,
+        storage: StorageEngine, lazy: bool = False
     ):
-        self.file = file
-        self._data = load(
-            file,
-            to_object=type(defaults),
-            if_error=defaults
-        )
+        self.path = path
+        self.defaults = defaults
+        self.storage = storage
+        self.lazy = lazy
 
     def __repr__(self) -> str:
         """Returns repr(self)"""
-        return repr(self._data)
+        return repr(self.get())
+
+    def _convert(self, data: JSON_like_any) -> JSON_like:
+        return objectify(data, type(self.defaults), self.lazy)
+
+    def _load(self) -> JSON_like:
+        start = time.perf_counter()
+        try:
+            data = self.storage.read(self.path)
+        except FileNotFoundError:
+            data = deepcopy(self.defaults)
+            self.storage.write(self.path, data)
+
+        data = self._convert(data)
+        self.storage.metrics.record(self.path, GET, time.perf_counter() - start)
+        return data
 
     def get(self) -> JSON_like:
         """Returns the config file data.
@@ -65,18 +120,146 @@ class Group:
                 Config file data
 
         """
-        return self._data
+        return self.storage.cache.get(self.path, self._load)
 
     def set(self, data: JSON_like):
         """Overwrite previous data to new given value.
+        The file itself is written on next cache flush.
+
+        Parameters
+            data: Union[List[`Objectify`], `Objectify`]
+                The data to set
+
+        """
+        start = time.perf_counter()
+        self.storage.cache.set(self.path, data)
+        self.storage.metrics.record(self.path, SET, time.perf_counter() - start)
+        self.storage.notify(self.path)
+
+    def update(self, path: Union[int, str, Sequence[Union[int, str]]], value: Any):
+        """Sets a single element of the config file data.
+        Only the change is written on next cache flush,
+        instead of the whole file.
+
+        Parameters
+            path: Union[`int`, `str`, Sequence[Union[`int`, `str`]]]
+                The key, or the keys leading to the element
+                Example: `group.update(('events', 0, 'title'), 'foo')`
+                <==> `group.get().events[0].title = 'foo'`
+            value: Any
+                The value to set
+
+        """
+        self._patch(UPDATE, path, value)
+
+    def append(self, path: Union[int, str, Sequence[Union[int, str]]], item: Any):
+        """Appends item to a list of the config file data.
+        Only the change is written on next cache flush,
+        instead of the whole file.
+
+        Parameters
+            path: Union[`int`, `str`, Sequence[Union[`int`, `str`]]]
+                The key, or the keys leading to the list
+                Example: `group.append('events', event)`
+                <==> `group.get().events.append(event)`
+            item: Any
+                The item to append
+
+        """
+        self._patch(APPEND, path, item)
+
+    def _patch(self, op: str, path: Union[int, str, Sequence[Union[int, str]]], value: Any):
+        keys = [path] if isinstance(path, (int, str)) else list(path)
+
+        start = time.perf_counter()
+        apply_op(self.get(), op, keys, value)
+        self.storage.cache.patch(self.path, dump_op(op, keys, value))
+        self.storage.metrics.record(self.path, EDIT, time.perf_counter() - start)
+        self.storage.notify(self.path)
+
+    async def aget(self) -> JSON_like:
+        """Same as `Group.get`, but loads the file without blocking
+        the event loop if not cached yet.
+
+        Returns
+            Union[List[`Objectify`], `Objectify`]
+                Config file data
+
+        """
+        if self.path not in self.storage.cache:
+            start = time.perf_counter()
+            try:
+                data = self._convert(await self.storage.aread(self.path))
+            except FileNotFoundError:
+                data = self._convert(deepcopy(self.defaults))
+                await self.storage.awrite(self.path, data)
+
+            data = self.storage.cache.get(self.path, lambda: data)
+            self.storage.metrics.record(self.path, GET, time.perf_counter() - start)
+            return data
+
+        return self.get()
+
+    async def aset(self, data: JSON_like):
+        """Same as `Group.set`, but also writes the file right away,
+        without blocking the event loop.
 
         Parameters
             data: Union[List[`Objectify`], `Objectify`]
                 The data to set
 
         """
-        write(self.file, data)
-        self._data = data
+        self.set(data)
+        await self.storage.cache.acommit(self.path)
+
+    @asynccontextmanager
+    async def locked(self) -> AsyncIterator[JSON_like]:
+        """Returns a context manager giving exclusive access to the
+        config file data among coroutines using `Group.locked` or
+        `Group.modify` on the same path, and setting it back on exit.
+        If an exception is raised, data isn't set back, but changes
+        already made in place remain cached.
+
+        Example:
+            `async with group.locked() as data:`
+            `    data.count += 1`
+
+        Returns
+            AsyncIterator[Union[List[`Objectify`], `Objectify`]]
+
+        """
+        async with self.storage.lock(self.path):
+            data = await self.aget()
+            yield data
+            self.set(data)
+
+    async def modify(
+        self, function: Callable[[JSON_like], Union[JSON_like, Awaitable[JSON_like], None]]
+    ) -> JSON_like:
+        """Applies function to the config file data, under the
+        same lock as `Group.locked`, and sets its result back.
+
+        Parameters
+            function: Callable[[Union[List[`Objectify`], `Objectify`]], Any]
+                The function, or coroutine function, editing data in
+                place and returning `None`, or returning new data
+
+        Returns
+            Union[List[`Objectify`], `Objectify`]
+                The new data
+
+        """
+        async with self.storage.lock(self.path):
+            data = await self.aget()
+            result = function(data)
+            if isawaitable(result):
+                result = await result
+            if result is not None:
+                data = result
+
+            self.set(data)
+
+        return data
 
 class Config:
     """Represents a `Cog` configuration files tree.
@@ -95,6 +278,12 @@ class Config:
 
             Example: `guild={'foo': []}` will initiate any new guild
             configuation file to `{'foo': []}`
+        storage: `StorageEngine`
+            The storage engine shared by the bot `Config` objects,
+            usually `Bot.storage`
+        lazy: `bool` = `False`
+            Whether lists of `Objectify` are loaded as `LazyList`,
+            converting their elements on first access only
 
     """
     GLOBALS = "globals"
@@ -104,15 +293,16 @@ class Config:
     ROLE = "role"
     USER = "user"
 
-    EXTENSION = ".json"
-
     def __init__(
         self, cog: Cog, *,
         globals: JSON_like = Objectify(), channel: JSON_like = Objectify(),
         guild:   JSON_like = Objectify(), member:  JSON_like = Objectify(),
-        role:    JSON_like = Objectify(), user:    JSON_like = Objectify()
+        role:    JSON_like = Objectify(), user:    JSON_like = Objectify(),
+        storage: StorageEngine, lazy: bool = False
     ):
         self.cog = cog.__class__.__name__
+        self.storage = storage
+        self.lazy = lazy
 
         self.defaults_globals(globals)
         self.defaults_channel(channel)
@@ -131,31 +321,67 @@ class Config:
                 The path keys to targeted folder
 
         """
-        path_to_folder, files = self._get_folder(*scopes)
-        for file in files:
-            write(f"{path_to_folder}/{file}", defaults)
+        path_to_folder, names = self._get_folder(*scopes)
+        for name in names:
+            self.storage.cache.set(path := f"{path_to_folder}/{name}", deepcopy(defaults))
+            self.storage.notify(path)
 
-    def _get_all(self, *scopes: str, defaults: JSON_like = Objectify()) -> Dict[str, Group]:
+    def _get_all(
+        self, *scopes: str, defaults: JSON_like = Objectify(), prefetch: bool = False
+    ) -> Dict[str, Group]:
         """Returns a dict composed of files names from requested directory
         as keys and `Group` corresponding to file as values.
+        Files are only read on first `Group.get`, unless prefetch is set.
 
         Parameters
             *scopes: `str`
                 The path elements leading to directory
+            prefetch: `bool` = `False`
+                Whether to read every file which isn't cached yet
+                right away, at once
 
         Returns
             Dict[`str`, `Group`]
 
         """
-        if not defaults:
-            data_type = self._defaults_globals
+        start = time.perf_counter()
+        path_to_folder, names = self._get_folder(*scopes)
 
-        path_to_folder, files = self._get_folder(*scopes)
+        groups = {
+            name: Group(
+                f"{path_to_folder}/{name}", defaults=defaults,
+                storage=self.storage, lazy=self.lazy
+            )
+            for name in names
+        }
 
-        groups = [Group(f"{path_to_folder}/{file}", defaults=defaults) for file in files]
+        uncached = [name for name, group in groups.items() if group.path not in self.storage.cache]
+        if prefetch and uncached:
+            self._fill(groups, self.storage.read_all(path_to_folder, uncached))
+
+        self.storage.metrics.record(path_to_folder, GET_ALL, time.perf_counter() - start)
+        return groups
+
+    async def _aget_all(
+        self, *scopes: str, defaults: JSON_like = Objectify()
+    ) -> Dict[str, Group]:
+        """Same as `Config._get_all` with prefetch set, but reads
+        files without blocking the event loop.
+
+        """
+        groups = self._get_all(*scopes, defaults=defaults)
 
-        files_without_extension = [file[:-len(self.EXTENSION)] for file in files]
-        return {f: g for f, g in zip(files_without_extension, groups)}
+        path_to_folder = "/".join([self.cog, *map(str, scopes)])
+        uncached = [name for name, group in groups.items() if group.path not in self.storage.cache]
+        if uncached:
+            self._fill(groups, await self.storage.aread_all(path_to_folder, uncached))
+
+        return groups
+
+    def _fill(self, groups: Dict[str, Group], documents: Dict[str, JSON_like_any]):
+        for name, document in documents.items():
+            group = groups[name]
+            self.storage.cache.get(group.path, partial(group._convert, document))
 
     def _get_file(self, *primary_keys: str, defaults: JSON_like = Objectify()) -> Group:
         """Returns the wanted configuration file according to given arguments,
@@ -164,7 +390,7 @@ class Config:
         Parameters
             *primary_keys: `str`
                 The keys leading to configuration file
-                Example: `self._get_file('foo', 'bar')` -> `'{self.cog}/foo/bar.json'`
+                Example: `self._get_file('foo', 'bar')` -> `'{self.cog}/foo/bar'`
 
         Returns
             `Group`
@@ -173,13 +399,12 @@ class Config:
         """
         path = f"{self.cog}/"
         path += "/".join(primary_keys) if primary_keys else self.GLOBALS
-        path += self.EXTENSION
 
-        return Group(path, defaults=defaults)
+        return Group(path, defaults=defaults, storage=self.storage, lazy=self.lazy)
 
     def _get_folder(self, *scopes: str) -> str and List[str]:
-        """Returns path to folder and folder files names.
-        If path doesn't exist, safely creates it and returns an empty files list.
+        """Returns path to folder and folder files names,
+        including files which are only cached yet.
 
         Parameters
             *scopes: `str`
@@ -192,15 +417,15 @@ class Config:
                 Folder files names
 
         """
-        path_to_folder = f"{self.cog}/{'/'.join(map(str, scopes))}"
+        path_to_folder = "/".join([self.cog, *map(str, scopes)])
 
-        try:
-            files = [file for file in os.listdir(path_to_folder) if file.endswith(self.EXTENSION)]
-        except FileNotFoundError:
-            mkdir_p(path_to_folder)
-            files = list()
+        names = set(self.storage.list(path_to_folder))
+        for path in self.storage.cache.dirty(f"{path_to_folder}/"):
+            name = path[len(path_to_folder) + 1:]
+            if "/" not in name:
+                names.add(name)
 
-        return path_to_folder, files
+        return path_to_folder, sorted(names)
 
     def defaults_globals(self, defaults: JSON_like):
         """Sets default value for global configuration files.
@@ -262,6 +487,55 @@ class Config:
         """
         self._defaults_user = defaults
 
+    def on_change(self, scope: str, callback: Callable[..., Any]):
+        """Registers callback to be called whenever a configuration
+        file of scope changes, either through `Group` methods or
+        externally, once `StorageEngine.watch` has been called.
+        callback is called with the ids leading to changed file.
+
+        Example:
+            `config.on_change(Config.GUILD, callback)` will call
+            `callback(guild_id)` on every guild file change.
+
+        Parameters
+            scope: `str`
+                The scope to watch: `Config.GLOBALS`, `Config.GUILD`...
+            callback: Callable[..., Any]
+                The function to call
+
+        """
+        self.storage.subscribe(self.cog, scope, callback)
+
+    def off_change(self, scope: str, callback: Callable[..., Any]):
+        """Cancels a `Config.on_change` call, meant to be called
+        on `Cog` unload.
+
+        """
+        self.storage.unsubscribe(self.cog, scope, callback)
+
+    def flush(self):
+        """Writes back every cached change of `self.cog` configuration files.
+        Meant to be called on `Cog` unload.
+
+        """
+        self.storage.flush(f"{self.cog}/")
+
+    def batch(self) -> Batch:
+        """Returns a context manager holding back writes of `self.cog`
+        configuration files until it exits, so that every change
+        made to a same file within the block costs a single write.
+        Reads made within the block see the pending changes.
+
+        Example:
+            `async with config.batch():`
+            `    ...`
+
+        Returns
+            `Batch`
+
+        """
+        return self.storage.cache.batch(f"{self.cog}/")
+
     def globals(self) -> Group:
         return self._get_file(defaults=self._defaults_globals)
 
@@ -461,27 +735,47 @@ class Config:
             defaults=self._defaults_user
         )
 
-    def all_channels(self) -> Dict[int, Group]:
+    def all_channels(self, prefetch: bool = False) -> Dict[int, Group]:
         """Returns a dict composed of `GuildChannel` ids as keys and
         `Group` corresponding to `GuildChannel` as values.
 
+        Parameters
+            prefetch: `bool` = `False`
+                Whether to read every file right away, at once,
+                instead of on first `Group.get`
+
         Returns
             Dict[`int`, `Group`]
 
         """
-        return {int(k): v for k, v in self._get_all(self.CHANNEL, defaults=self._defaults_channel).items()}
+        groups = self._get_all(
+            self.CHANNEL,
+            defaults=self._defaults_channel,
+            prefetch=prefetch
+        )
+        return {int(k): v for k, v in groups.items()}
 
-    def all_guilds(self) -> Dict[int, Group]:
+    def all_guilds(self, prefetch: bool = False) -> Dict[int, Group]:
         """Returns a dict composed of `Guild` ids as keys and
         `Group` corresponding to `Guild` as values.
 
+        Parameters
+            prefetch: `bool` = `False`
+                Whether to read every file right away, at once,
+                instead of on first `Group.get`
+
         Returns
             Dict[`int`, `Group`]
 
         """
-        return {int(k): v for k, v in self._get_all(self.GUILD, defaults=self._defaults_guild).items()}
+        groups = self._get_all(
+            self.GUILD,
+            defaults=self._defaults_guild,
+            prefetch=prefetch
+        )
+        return {int(k): v for k, v in groups.items()}
 
-    def all_members(self, guild: Guild) -> Dict[int, Group]:
+    def all_members(self, guild: Guild, prefetch: bool = False) -> Dict[int, Group]:
         """Returns a dict composed of `Member` ids as keys and
         `Group` corresponding to `Member` as values.
         /!\ As A `Member` is part of a `Guild`, `Guild` must be provided.
@@ -489,14 +783,40 @@ class Config:
         Parameters
             guild: `Guild`
                 The `Guild`
+            prefetch: `bool` = `False`
+                Whether to read every file right away, at once,
+                instead of on first `Group.get`
 
         Returns
             Dict[`int`, `Group`]
 
         """
-        return {int(k): v for k, v in self._get_all(self.MEMBER, guild.id, defaults=self._defaults_member).items()}
+        groups = self._get_all(
+            self.MEMBER, guild.id,
+            defaults=self._defaults_member,
+            prefetch=prefetch
+        )
+        return {int(k): v for k, v in groups.items()}
+
+    async def aall_members(self, guild: Guild) -> Dict[int, Group]:
+        """Same as `Config.all_members` with prefetch set, but reads
+        files without blocking the event loop.
+
+        Parameters
+            guild: `Guild`
+                The `Guild`
+
+        Returns
+            Dict[`int`, `Group`]
+
+        """
+        groups = await self._aget_all(
+            self.MEMBER, guild.id,
+            defaults=self._defaults_member
+        )
+        return {int(k): v for k, v in groups.items()}
 
-    def all_members_with_guild_id(self, guild_id: int) -> Dict[int, Group]:
+    def all_members_with_guild_id(self, guild_id: int, prefetch: bool = False) -> Dict[int, Group]:
         """Returns a dict composed of `Member` ids as keys and
         `Group` corresponding to `Member` as values.
         /!\ As A `Member` is part of a `Guild`, `Guild` id must be provided.
@@ -504,32 +824,60 @@ class Config:
         Parameters
             guild_id: `int`
                 The `Guild` id
+            prefetch: `bool` = `False`
+                Whether to read every file right away, at once,
+                instead of on first `Group.get`
 
         Returns
             Dict[`int`, `Group`]
 
         """
-        return {int(k): v for k, v in self._get_all(self.MEMBER, guild_id, defaults=self._defaults_member).items()}
+        groups = self._get_all(
+            self.MEMBER, guild_id,
+            defaults=self._defaults_member,
+            prefetch=prefetch
+        )
+        return {int(k): v for k, v in groups.items()}
 
-    def all_roles(self) -> Dict[int, Group]:
+    def all_roles(self, prefetch: bool = False) -> Dict[int, Group]:
         """Returns a dict composed of `Role` ids as keys and
         `Group` corresponding to `Role` as values.
 
+        Parameters
+            prefetch: `bool` = `False`
+                Whether to read every file right away, at once,
+                instead of on first `Group.get`
+
         Returns
             Dict[`int`, `Group`]
 
         """
-        return {int(k): v for k, v in self._get_all(self.ROLE, defaults=self._defaults_role).items()}
+        groups = self._get_all(
+            self.ROLE,
+            defaults=self._defaults_role,
+            prefetch=prefetch
+        )
+        return {int(k): v for k, v in groups.items()}
 
-    def all_users(self) -> Dict[int, Group]:
+    def all_users(self, prefetch: bool = False) -> Dict[int, Group]:
         """Returns a dict composed of `User` ids as keys and
         `Group` corresponding to `User` as values.
 
+        Parameters
+            prefetch: `bool` = `False`
+                Whether to read every file right away, at once,
+                instead of on first `Group.get`
+
         Returns
             Dict[`int`, `Group`]
 
         """
-        return {int(k): v for k, v in self._get_all(self.USER, defaults=self._defaults_user).items()}
+        groups = self._get_all(
+            self.USER,
+            defaults=self._defaults_user,
+            prefetch=prefetch
+        )
+        return {int(k): v for k, v in groups.items()}
 
     def clear_globals(self):
         """Sets to default every global `Group` for `self.cog`.
@@ -583,7 +931,7 @@ class Config:
                 The guild to aim for
 
         """
-        if guild:
+        if guild_id:
             self._clear_folder(
                 self.MEMBER,
                 guild_id,
@@ -611,71 +959,6 @@ class Config:
 
 ############################################ FUNCTIONS ############################################
 
-def mkdir_p(path: str):
-    """Safely creates path to desired location if it doesn't exist.
-
-    Parameters
-        path: `str`
-            The path to desired location
-
-    """
-    if path:
-        try:
-            os.makedirs(path)
-        except OSError as exc:
-            if exc.errno == errno.EEXIST and os.path.isdir(path):
-                pass
-            else:
-                raise OSError("Couldn't create file or directory.")
-
-def safe_open(path: str, mode: str) -> open:
-    """Same as the `open` function, but safely creates file before.
-
-    """
-    mkdir_p(os.path.dirname(path))
-    return open(path, mode=mode)
-
-def load(
-    path: str, if_error: Union[list, dict] = [], to_object: Type[JSON_like] = None
-) -> JSON_like_any:
-    """Loads data from file path, as a json data file.
-
-    Parameters
-        path: `str`
-            Desired file location path
-        if_error: Union[`list`, `dict`] = `[]`
-            Value to return if file doesn't exist
-        to_object: Union[List[`Objectify`], `Objectify`, `type`] = `None`
-            Automatically casts data to type if given, or
-            keeps data as a simple `dict` or `list`.
-
-    Returns
-        Union[List[`Objectify`], `Objectify`, `dict`, `list`]
-            The extracted data from requested path
-
-    """
-    try:
-        with open(path, 'r') as file:
-            data = json.load(file)
-    except FileNotFoundError or NotADirectoryError:
-        write(path, if_error)
-        data = if_error
-
-    return objectify(data, to_object) if to_object else data
-
-def write(path: str, data: JSON_like_any):
-    """Writes data to path, as a json data file.
-
-    Parameters
-        path: `str`
-            Desired file location path
-        data: Union[`list`, `dict`, `Objectify`]
-            The json-like data to write in file
-
-    """
-    with safe_open(path, 'w') as file:
-        file.write(json.dumps(dictify(data)))
-
 #def update_config(
 #    value: Union[List[Objectify], Objectify, List[Any], Dict[Any, Any]],
 #    config: Group, *attributes: str,
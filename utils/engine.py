@@ -0,0 +1,308 @@
+############################################# IMPORTS #############################################
+
+import asyncio
+import atexit
+import os
+import time
+
+from asyncio import AbstractEventLoop
+from collections import Counter
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Set,
+    Tuple
+)
+
+from .cache import FLUSH_INTERVAL
+from .cache import Cache
+from .metrics import Metrics
+from .metrics import (
+    PATCH,
+    READ,
+    READ_ALL,
+    WRITE
+)
+from .storage import (
+    Backend,
+    JsonBackend
+)
+from .storage import (
+    mkdir_p,
+    settle,
+    written
+)
+from .watcher import (
+    Watcher,
+    make_watcher
+)
+from .objectify import JSON_like_any
+
+############################################# CLASSES #############################################
+
+class StorageEngine:
+    """The storage shared by every `Config` of the bot.
+
+    Owns the storage backend, the cache every configuration file is
+    kept in, with its single memory budget and write-back task, the
+    change notifications, the per-file locks and the `Metrics` of
+    every operation, so that `Config` objects are only namespaced
+    views over it.
+
+    Parameters
+        backend: `Backend` = `JsonBackend()`
+            The storage to read from and write to
+        max_entries: `int` = `None`
+            The number of files to keep cached at most,
+            files with pending changes excepted
+
+    """
+    def __init__(self, backend: Backend = None, max_entries: int = None):
+        self.backend = backend or JsonBackend()
+        self.cache = Cache(
+            writer=self._write_back,
+            awriter=self._awrite_back,
+            patcher=self._patch_back,
+            apatcher=self._apatch_back,
+            max_entries=max_entries
+        )
+        self.watcher: Watcher = None
+        self.counters: Counter = Counter()
+        self.metrics = Metrics()
+        self.backend.metrics = self.metrics
+
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._subscribers: Dict[Tuple[str, str], List[Callable[..., Any]]] = {}
+        self._watched_cogs: Set[str] = set()
+
+        atexit.register(self.flush)
+
+    def set_backend(self, backend: Backend):
+        """Replaces the storage to read from and write to.
+        Pending changes are written to the previous storage beforehand.
+
+        Parameters
+            backend: `Backend`
+                The new storage
+
+        """
+        self.cache.evict()
+        self.backend.close()
+        self.backend = backend
+        self.backend.metrics = self.metrics
+
+    def start(self, loop: AbstractEventLoop, interval: float = FLUSH_INTERVAL):
+        """Starts writing back cached changes every interval seconds,
+        and watching files for external changes, on loop.
+
+        Parameters
+            loop: `AbstractEventLoop`
+                The loop to run on
+            interval: `float` = `FLUSH_INTERVAL`
+                The time between two write backs, in seconds
+
+        """
+        self.cache.start(loop, interval)
+        self.watch(loop)
+
+    def flush(self, prefix: str = ""):
+        """Writes back every cached change of paths starting with prefix."""
+        self.cache.flush(prefix)
+
+    async def aflush(self, prefix: str = ""):
+        """Same as `StorageEngine.flush`, without blocking the event loop."""
+        await self.cache.aflush(prefix)
+
+    def close(self):
+        """Stops background tasks, writes back every cached change
+        and closes the backend.
+
+        """
+        self.cache.stop()
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+            self._watched_cogs.clear()
+
+        self.flush()
+        self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns a snapshot of the engine activity.
+
+        Returns
+            Dict[`str`, Any]
+                The backend name, cache usage and hit/miss counts,
+                and the number of backend reads, writes and patches
+
+        """
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.cache),
+            "max_entries": self.cache.max_entries,
+            "dirty": len(self.cache.dirty()),
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "reads": self.counters["reads"],
+            "writes": self.counters["writes"],
+            "patches": self.counters["patches"]
+        }
+
+    ################### BACKEND #####################
+
+    def read(self, path: str) -> JSON_like_any:
+        self.counters["reads"] += 1
+        start = time.perf_counter()
+        try:
+            return self.backend.read(path)
+        finally:
+            self.metrics.record(path, READ, time.perf_counter() - start)
+
+    async def aread(self, path: str) -> JSON_like_any:
+        self.counters["reads"] += 1
+        start = time.perf_counter()
+        try:
+            return await self.backend.aread(path)
+        finally:
+            self.metrics.record(path, READ, time.perf_counter() - start)
+
+    def read_all(self, folder: str, names: Iterable[str]) -> Dict[str, JSON_like_any]:
+        start = time.perf_counter()
+        try:
+            documents = self.backend.read_all(folder, names)
+        finally:
+            self.metrics.record(folder, READ_ALL, time.perf_counter() - start)
+        self.counters["reads"] += len(documents)
+        return documents
+
+    async def aread_all(self, folder: str, names: Iterable[str]) -> Dict[str, JSON_like_any]:
+        start = time.perf_counter()
+        try:
+            documents = await self.backend.aread_all(folder, list(names))
+        finally:
+            self.metrics.record(folder, READ_ALL, time.perf_counter() - start)
+        self.counters["reads"] += len(documents)
+        return documents
+
+    def list(self, folder: str) -> List[str]:
+        return self.backend.list(folder)
+
+    def write(self, path: str, data: JSON_like_any):
+        self.counters["writes"] += 1
+        start = time.perf_counter()
+        try:
+            settle(path)
+            self.backend.write(path, data)
+        finally:
+            self.metrics.record(path, WRITE, time.perf_counter() - start)
+
+    async def awrite(self, path: str, data: JSON_like_any):
+        self.counters["writes"] += 1
+        start = time.perf_counter()
+        try:
+            await self.backend.awrite(path, data)
+        finally:
+            self.metrics.record(path, WRITE, time.perf_counter() - start)
+
+    def _write_back(self, path: str, data: JSON_like_any):
+        self.write(path, data)
+
+    async def _awrite_back(self, path: str, data: JSON_like_any):
+        await self.awrite(path, data)
+
+    def _patch_back(self, path: str, ops: List[str]) -> int:
+        self.counters["patches"] += 1
+        start = time.perf_counter()
+        try:
+            settle(path)
+            return self.backend.patch(path, ops)
+        finally:
+            self.metrics.record(path, PATCH, time.perf_counter() - start)
+
+    async def _apatch_back(self, path: str, ops: List[str]) -> int:
+        self.counters["patches"] += 1
+        start = time.perf_counter()
+        try:
+            return await self.backend.apatch(path, ops)
+        finally:
+            self.metrics.record(path, PATCH, time.perf_counter() - start)
+
+    #################### LOCKS ######################
+
+    def lock(self, path: str) -> asyncio.Lock:
+        """Returns the lock of the configuration file at path."""
+        try:
+            return self._locks[path]
+        except KeyError:
+            return self._locks.setdefault(path, asyncio.Lock())
+
+    ################ NOTIFICATIONS ##################
+
+    def subscribe(self, cog: str, scope: str, callback: Callable[..., Any]):
+        """Registers callback to be called on every change of
+        configuration files of cog in scope, see `Config.on_change`.
+
+        """
+        self._subscribers.setdefault((cog, scope), []).append(callback)
+        if self.watcher:
+            self._watch_cog(cog)
+
+    def unsubscribe(self, cog: str, scope: str, callback: Callable[..., Any]):
+        """Cancels a `StorageEngine.subscribe` call."""
+        self._subscribers[(cog, scope)].remove(callback)
+
+    def notify(self, path: str):
+        """Calls the callbacks subscribed to the configuration file
+        at path with the ids leading to it.
+
+        """
+        cog, scope, *keys = path.split("/")
+        for callback in self._subscribers.get((cog, scope), []):
+            try:
+                callback(*map(int, keys))
+            except Exception as error:
+                print(f"CONFIG: {cog} {scope} change callback failed: {error!r}")
+
+    def watch(self, loop: AbstractEventLoop):
+        """Starts watching configuration files of every `Cog` with
+        subscribed callbacks, so that external changes are reported
+        to them, and dropped from cache if not conflicting with
+        pending changes. Only files of `JsonBackend` are watched.
+
+        Parameters
+            loop: `AbstractEventLoop`
+                The loop to call callbacks on
+
+        """
+        if self.watcher or not isinstance(self.backend, JsonBackend):
+            return
+
+        self.watcher = make_watcher(partial(loop.call_soon_threadsafe, self._external_change))
+        for cog, _ in list(self._subscribers):
+            self._watch_cog(cog)
+        self.watcher.start()
+
+    def _watch_cog(self, cog: str):
+        if cog not in self._watched_cogs:
+            mkdir_p(root := os.path.join(self.backend.root, cog))
+            self.watcher.watch(root)
+            self._watched_cogs.add(cog)
+
+    def changed(self, path: str, discard: bool = False):
+        """Reports a change of the document at path made without
+        `Config`, dropping it from cache unless it has pending changes,
+        or along with them if discard is set, and calling the
+        callbacks subscribed to it.
+
+        """
+        self.cache.drop(path, discard)
+        self.notify(path)
+
+    def _external_change(self, file: str):
+        path = self.backend.path_of(file)
+        if path and not written(file):
+            self.changed(path)
@@ -0,0 +1,159 @@
+############################################# IMPORTS #############################################
+
+import bisect
+import threading
+import time
+
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple
+)
+
+############################################# GLOBALS #############################################
+
+# latency histograms buckets upper bounds, in seconds
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+# configuration files operations, cache hits excepted for get
+EDIT = "edit"
+GET = "get"
+GET_ALL = "get_all"
+SET = "set"
+
+# storage operations
+PATCH = "patch"
+READ = "read"
+READ_ALL = "read_all"
+WRITE = "write"
+
+############################################# CLASSES #############################################
+
+class Histogram:
+    """Counts latencies of an operation, by `BUCKETS`."""
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        bounds = [f"<={bound * 1000:g}ms" for bound in BUCKETS] + [f">{BUCKETS[-1] * 1000:g}ms"]
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "max_ms": self.max * 1000,
+            "histogram": dict(zip(bounds, self.buckets))
+        }
+
+class Metrics:
+    """Counts configuration storage operations, their latency and
+    the bytes read and written, broken down by cog and scope.
+
+    Every path is accounted to its `'{cog}/{scope}'` prefix,
+    for example `'EmojiData/member'`.
+
+    """
+    def __init__(self):
+        self.since = time.time()
+
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._bytes: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: str, operation: str, seconds: float):
+        """Accounts an operation made on path, which took seconds."""
+        key = (scope_of(path), operation)
+        with self._lock:
+            try:
+                histogram = self._histograms[key]
+            except KeyError:
+                histogram = self._histograms[key] = Histogram()
+            histogram.add(seconds)
+
+    def add_bytes(self, path: str, read: int = 0, written: int = 0):
+        """Accounts bytes read from and written to storage for path."""
+        scope = scope_of(path)
+        with self._lock:
+            try:
+                counts = self._bytes[scope]
+            except KeyError:
+                counts = self._bytes[scope] = [0, 0]
+            counts[0] += read
+            counts[1] += written
+
+    def reset(self):
+        """Forgets every count so far."""
+        with self._lock:
+            self._histograms.clear()
+            self._bytes.clear()
+            self.since = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns every count, as json-like data.
+
+        Returns
+            Dict[`str`, Any]
+                The counting start timestamp, and for every
+                `'{cog}/{scope}'`, the bytes read and written and
+                the latency statistics of every operation
+
+        """
+        with self._lock:
+            scopes = {}
+            for scope, (read, written) in self._bytes.items():
+                scopes[scope] = {"bytes_read": read, "bytes_written": written, "operations": {}}
+            for (scope, operation), histogram in self._histograms.items():
+                entry = scopes.setdefault(
+                    scope, {"bytes_read": 0, "bytes_written": 0, "operations": {}}
+                )
+                entry["operations"][operation] = histogram.to_dict()
+
+        return {
+            "since": self.since,
+            "seconds": time.time() - self.since,
+            "scopes": dict(sorted(scopes.items()))
+        }
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Returns, for every `'{cog}/{scope}'`, its bytes and share of
+        all bytes read and written, storage operations count and total
+        time, by decreasing share.
+
+        """
+        scopes = self.snapshot()["scopes"]
+        io = sum(s["bytes_read"] + s["bytes_written"] for s in scopes.values()) or 1
+
+        rows = []
+        for scope, s in scopes.items():
+            storage_operations = [
+                h for operation, h in s["operations"].items()
+                if operation in (READ, READ_ALL, WRITE, PATCH)
+            ]
+            rows.append({
+                "scope": scope,
+                "bytes_read": s["bytes_read"],
+                "bytes_written": s["bytes_written"],
+                "share": (s["bytes_read"] + s["bytes_written"]) / io,
+                "operations": sum(h["count"] for h in storage_operations),
+                "total_ms": sum(h["total_ms"] for h in storage_operations)
+            })
+
+        return sorted(rows, key=lambda row: row["share"], reverse=True)
+
+############################################ FUNCTIONS ############################################
+
+def scope_of(path: str) -> str:
+    """Returns the `'{cog}/{scope}'` prefix of a document or folder path."""
+    cog, _, rest = path.partition("/")
+    return f"{cog}/{rest.partition('/')[0]}"
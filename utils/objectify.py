@@ -2,6 +2,7 @@
 
 from typing import (
     Any,
+    Callable,
     Dict,
     Iterable,
     List,
@@ -10,6 +11,8 @@ from typing import (
     Union
 )
 
+from typing import get_args
+
 from .utils import (
     isofclass,
     isoftype
@@ -17,7 +20,41 @@ from .utils import (
 
 ############################################# CLASSES #############################################
 
-class Objectify:
+class ObjectifyMeta(type):
+    """Metaclass of `Objectify`, handling the `compact` class
+    keyword argument.
+
+    Compact classes declare `__slots__` from their annotations,
+    so that their instances don't carry a `__dict__`, which
+    greatly reduces their memory footprint. In exchange, only
+    annotated attributes can be set on them.
+
+    Example:
+        class C(Objectify, compact=True):
+            d: int
+            def __init__(self, d: int):
+                super().__init__(d=d)
+
+    """
+    def __new__(mcs, name: str, bases: tuple, namespace: dict, compact: bool = False):
+        if compact and "__slots__" not in namespace:
+            inherited = {
+                slot
+                for base in bases
+                for klass in base.__mro__
+                for slot in getattr(klass, "__slots__", ())
+            }
+            namespace["__slots__"] = tuple(
+                key for key in namespace.get("__annotations__", {})
+                if key not in inherited
+            )
+
+        cls = super().__new__(mcs, name, bases, namespace)
+        # instances without __dict__, Objectify itself included
+        cls.__compact__ = not any("__dict__" in vars(klass) for klass in cls.__mro__)
+        return cls
+
+class Objectify(metaclass=ObjectifyMeta):
     """A more intuitive way to manipulate json-like dicts.
     Transforms any json-like `dict` into a both key and
     attribute-oriented class.
@@ -48,8 +85,19 @@ class Objectify:
     Considering the above configuration, both syntaxes are
     equivalent: A['b'][0]['d'] <==> A.b[0].d
 
+    Subclasses can be made compact by passing `compact=True`
+    in their definition, see `ObjectifyMeta`.
+
     """
     __annotations__ = {}
+    __slots__ = ()
+
+    def __new__(cls, *args, **kwargs):
+        # Objectify has no __dict__ for the sake of compact subclasses,
+        # so bare instances are made of a subclass which has one
+        if cls is Objectify:
+            cls = _Objectify
+        return super().__new__(cls)
 
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
@@ -98,6 +146,13 @@ class Objectify:
 
     def _compile(self) -> dict:
         """Compiles self in a dict structure"""
+        return converter(self.__class__).dump(self)
+
+    def _compile_items(self) -> dict:
+        """Compiles self in a dict structure, without relying on
+        class annotations.
+
+        """
         d = {}
         for key, value in self.items():
             if isinstance(value, Objectify):
@@ -111,30 +166,177 @@ class Objectify:
 
     def copy(self) -> "Objectify":
         """Same as dict.copy()"""
-        d = {}
-        for key, value in self.items():
-            if isinstance(value, Objectify):
-                d[key] = value.copy()
-            elif isoftype(value, (List[Objectify], Tuple[Objectify])):
-                d[key] = [x.copy() for x in value]
-            else:
-                d[key] = value
-        return self.__class__(**d)
+        if not self.__annotations__:
+            return self.__class__(**{key: _copy_value(value) for key, value in self.items()})
+
+        convert = converter(self.__class__)
+        copy = convert.load(convert.dump(self))
+
+        # attributes set besides annotated ones are kept as well
+        if not self.__compact__:
+            for key in self.__dict__.keys() - self.__annotations__.keys():
+                setattr(copy, key, _copy_value(self.__dict__[key]))
+
+        return copy
 
     def items(self) -> Iterable:
         """Same as dict.items()"""
+        if self.__compact__:
+            return [(key, getattr(self, key)) for key in self.keys()]
         return self.__dict__.items()
     
     def keys(self) -> Iterable:
         """Same as dict.keys()"""
+        if self.__compact__:
+            return [key for key in self.__annotations__ if hasattr(self, key)]
         return self.__dict__.keys()
 
     def values(self) -> Iterable:
         """Same as dict.values()"""
+        if self.__compact__:
+            return [getattr(self, key) for key in self.keys()]
         return self.__dict__.values()
 
+class _Objectify(Objectify):
+    """The class of bare `Objectify` instances."""
+
+class LazyList(list):
+    """A `list` of `Objectify` built from a `list` of json-like
+    `dict`, converting each element on first access only, so that
+    elements never accessed cost no conversion at all.
+
+    Untouched elements are kept as they were read, which lets
+    `dictify` serialize them back without any conversion.
+
+    Parameters
+        iterable: Iterable[Union[`dict`, `Objectify`]]
+            The elements, converted or not
+        load: Callable[[`dict`], `Objectify`]
+            The elements conversion function
+
+    """
+    __slots__ = ("_load",)
+
+    def __init__(self, iterable: Iterable = (), load: Callable[[dict], Objectify] = None):
+        super().__init__(iterable)
+        self._load = load
+
+    def _get(self, index: int) -> Any:
+        item = list.__getitem__(self, index)
+        if isinstance(item, dict):
+            item = self._load(item)
+            list.__setitem__(self, index, item)
+        return item
+
+    def _load_all(self):
+        for index in range(len(self)):
+            self._get(index)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        """Returns self[index], converting element(s) if needed"""
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self)))]
+        return self._get(index)
+
+    def __iter__(self) -> Iterable:
+        """Returns iter(self), converting elements along"""
+        for index in range(len(self)):
+            yield self._get(index)
+
+    def __reversed__(self) -> Iterable:
+        """Returns reversed(self), converting elements along"""
+        for index in reversed(range(len(self))):
+            yield self._get(index)
+
+    def __contains__(self, value: Any) -> bool:
+        self._load_all()
+        return super().__contains__(value)
+
+    def __eq__(self, value: Any) -> bool:
+        self._load_all()
+        return super().__eq__(value)
+
+    def __ne__(self, value: Any) -> bool:
+        return not self.__eq__(value)
+
+    def __add__(self, value: list) -> list:
+        self._load_all()
+        return super().__add__(value)
+
+    def __radd__(self, value: list) -> list:
+        # list + LazyList would copy unconverted elements otherwise
+        if not isinstance(value, list):
+            return NotImplemented
+        return [*value, *self]
+
+    def __iadd__(self, value: Iterable) -> "LazyList":
+        # still lazy: added elements are converted on access as well
+        self.extend(value)
+        return self
+
+    def __mul__(self, n: int) -> list:
+        self._load_all()
+        return super().__mul__(n)
+
+    def __rmul__(self, n: int) -> list:
+        return self.__mul__(n)
+
+    def __imul__(self, n: int) -> "LazyList":
+        # repeated elements must be the same objects, as in a list
+        self._load_all()
+        return super().__imul__(n)
+
+    def __repr__(self) -> str:
+        self._load_all()
+        return super().__repr__()
+
+    def copy(self) -> list:
+        self._load_all()
+        return super().copy()
+
+    def count(self, value: Any) -> int:
+        self._load_all()
+        return super().count(value)
+
+    def index(self, value: Any, *args: int) -> int:
+        self._load_all()
+        return super().index(value, *args)
+
+    def pop(self, index: int = -1) -> Any:
+        self._get(index)
+        return super().pop(index)
+
+    def remove(self, value: Any):
+        self._load_all()
+        super().remove(value)
+
+    def sort(self, **kwargs):
+        self._load_all()
+        super().sort(**kwargs)
+
+class Converter:
+    """Holds the conversion functions of an `Objectify` subclass,
+    generated once from its annotations by `converter`.
+
+    Attributes
+        load: Callable[[Union[`dict`, `Objectify`]], `Objectify`]
+            Builds an instance from its json-like representation
+        dump: Callable[[`Objectify`], `dict`]
+            Builds the json-like representation of an instance
+
+    """
+    __slots__ = ("load", "dump")
+
 ############################################# GLOBALS #############################################
 
+LIST = "list"
+OBJECT = "object"
+OTHER = "other"
+
+_CONVERTERS: Dict[type, Converter] = {}
+_LAZY_CONVERTERS: Dict[type, Converter] = {}
+_KINDS: Dict[Any, Tuple[str, type]] = {}
+
 JSON_like_nottransposed = Union[list, dict]
 JSON_like_transposed = Union[List[Objectify], Objectify, list]
 
@@ -149,15 +351,13 @@ def dictify(iterable: JSON_like_transposed) -> JSON_like_nottransposed:
     """
     if isinstance(iterable, Objectify):
         return iterable._compile()
-    elif isoftype(iterable, List[Objectify]):
-        return [x._compile() for x in iterable]
     elif isinstance(iterable, list):
-        return iterable
+        return _dump_list(iterable)
     else:
         return dict(iterable)
 
 def objectify(
-    iterable: JSON_like_transposed, cls: Type[JSON_like_transposed]
+    iterable: JSON_like_transposed, cls: Type[JSON_like_transposed], lazy: bool = False
 ) -> JSON_like_transposed:
     """Transforms any json-like `dict` into a both key and
     attribute-oriented class.
@@ -167,6 +367,9 @@ def objectify(
             The instance to convert
         cls: Union[List[`Objectify`], `Objectify`, list]
             The type to convert instance to
+        lazy: `bool` = `False`
+            Whether to convert lists of `Objectify` as `LazyList`,
+            whose elements are only converted on first access
 
     Returns
         Union[List[`Objectify`], `Objectify`, list]
@@ -177,24 +380,137 @@ def objectify(
         TypeError
 
     """
-    if isinstance(iterable, (list, tuple))\
-       and isofclass(cls, (List[Objectify], Tuple[Objectify])):
-        return [objectify(x, cls.__args__[0]) for x in iterable]
-
-    elif isinstance(iterable, (Objectify, dict)) and isofclass(cls, Objectify):
-        args = {}
-        for arg, c in cls.__annotations__.items():
-            if isofclass(c, Objectify):
-                args[arg] = objectify(iterable[arg], c)
-            elif isofclass(c, (List[Objectify], Tuple[Objectify])):
-                args[arg] = [objectify(x, c.__args__[0]) for x in iterable[arg]]
-            else:
-                args[arg] = iterable[arg]
+    kind, element = _kind(cls)
+
+    if kind == LIST and isinstance(iterable, (list, tuple)):
+        load = converter(element, lazy).load
+        return LazyList(iterable, load) if lazy else [load(x) for x in iterable]
 
-        return cls(**args)
+    elif kind == OBJECT and isinstance(iterable, (Objectify, dict)):
+        return converter(cls, lazy).load(iterable)
 
     elif isoftype(iterable, cls):
         return iterable
 
     else:
         raise TypeError("Mismatch. Conversion pattern and data pattern don't seem alike.")
+
+def converter(cls: Type[Objectify], lazy: bool = False) -> Converter:
+    """Returns the conversion functions of an `Objectify` subclass.
+    These are generated on first call from class annotations, as
+    straight-line functions, so that no `typing` introspection is
+    made on later conversions.
+
+    Example: for the `A`, `B` and `C` classes of `Objectify`
+    documentation, `converter(B).load` is equivalent to
+        def load(d):
+            return B(c=[converter(C).load(x) for x in d['c']])
+
+    Parameters
+        cls: Type[`Objectify`]
+            The class to convert from and to
+        lazy: `bool` = `False`
+            Whether load builds lists of `Objectify` as `LazyList`
+
+    Returns
+        `Converter`
+
+    """
+    converters = _LAZY_CONVERTERS if lazy else _CONVERTERS
+    try:
+        return converters[cls]
+    except KeyError:
+        pass
+
+    # registering before generating, for self-referencing classes
+    convert = converters[cls] = Converter()
+
+    if not cls.__annotations__: # nothing to rely on, so generic conversion
+        convert.load = lambda d: cls(**d)
+        convert.dump = cls._compile_items
+        return convert
+
+    namespace = {
+        "cls": cls,
+        "dump_extra": _dump_extra,
+        "dump_list": _dump_list,
+        "dump_value": _dump_value,
+        "lazy_list": LazyList
+    }
+    loads = []
+    dumps = []
+    for n, (arg, c) in enumerate(cls.__annotations__.items()):
+        kind, element = _kind(c)
+        if kind == OBJECT:
+            namespace[f"c{n}"] = converter(c, lazy)
+            loads.append(f"{arg}=c{n}.load(d[{arg!r}])")
+            dumps.append(f"{arg!r}: dump_value(o.{arg})")
+        elif kind == LIST:
+            namespace[f"c{n}"] = converter(element, lazy)
+            if lazy:
+                loads.append(f"{arg}=lazy_list(d[{arg!r}], c{n}.load)")
+            else:
+                loads.append(f"{arg}=[c{n}.load(x) for x in d[{arg!r}]]")
+            dumps.append(f"{arg!r}: dump_list(o.{arg})")
+        else:
+            loads.append(f"{arg}=d[{arg!r}]")
+            dumps.append(f"{arg!r}: o.{arg}")
+
+    # instances with a __dict__ may have attributes besides annotated ones
+    extra = (
+        f"    if len(o.__dict__) > {len(dumps)}:\n"
+        f"        dump_extra(o, d)\n"
+    ) if not cls.__compact__ else ""
+    source = (
+        f"def load(d):\n"
+        f"    return cls({', '.join(loads)})\n"
+        f"def dump(o):\n"
+        f"    d = {{{', '.join(dumps)}}}\n"
+        f"{extra}"
+        f"    return d\n"
+    )
+    exec(source, namespace)
+
+    convert.load = namespace["load"]
+    convert.dump = namespace["dump"]
+    return convert
+
+def _dump_list(value: Iterable) -> list:
+    # untouched LazyList elements are still json-like, so kept as is
+    if isinstance(value, LazyList):
+        value = list.__iter__(value)
+    return [x._compile() if isinstance(x, Objectify) else x for x in value]
+
+def _dump_value(value: Any) -> Any:
+    return value._compile() if isinstance(value, Objectify) else value
+
+def _dump_extra(o: Objectify, d: dict):
+    for key, value in o.__dict__.items():
+        if key not in d:
+            d[key] = _dump_list(value) if isinstance(value, list) else _dump_value(value)
+
+def _copy_value(value: Any) -> Any:
+    if isinstance(value, Objectify):
+        return value.copy()
+    elif isinstance(value, (list, tuple)):
+        return [x.copy() if isinstance(x, Objectify) else x for x in value]
+    return value
+
+def _kind(cls: Type[JSON_like_transposed]) -> Tuple[str, type]:
+    """Returns whether cls is an `Objectify` subclass, a list
+    of `Objectify` subclass (with that subclass), or anything else.
+
+    """
+    try:
+        return _KINDS[cls]
+    except KeyError:
+        pass
+
+    if isofclass(cls, (List[Objectify], Tuple[Objectify])):
+        kind = (LIST, get_args(cls)[0])
+    elif isofclass(cls, Objectify):
+        kind = (OBJECT, cls)
+    else:
+        kind = (OTHER, None)
+
+    return _KINDS.setdefault(cls, kind)
@@ -0,0 +1,1498 @@
+############################################# IMPORTS #############################################
+
+import asyncio
+import atexit
+import errno
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor
+)
+from concurrent.futures import wait
+from copy import deepcopy
+from functools import partial
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Set,
+    Tuple,
+    Type,
+    Union
+)
+
+from . import codec
+from .metrics import Metrics
+from .objectify import (
+    dictify,
+    objectify
+)
+from .objectify import (
+    JSON_like_any,
+    JSON_like_nottransposed,
+    JSON_like_transposed as JSON_like
+)
+
+############################################# GLOBALS #############################################
+
+EXTENSION = ".json"
+LOG_EXTENSION = ".log"
+MANIFEST = ".manifest"
+TEMP_EXTENSION = ".tmp"
+
+PACK_EXTENSION = ".pack"
+INDEX_EXTENSION = ".idx"
+
+SHARDED_SCOPES = ("member",)
+PACKED_SCOPES = ("member",)
+PACK_COMPACT_BYTES = 1 << 16
+
+APPEND = "append"
+UPDATE = "update"
+
+IO_WORKERS = 16
+SYNC_INTERVAL = 0.05
+EXECUTOR = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="config")
+
+_FILE_LOCKS: Dict[str, threading.Lock] = {}
+_WRITTEN_STATS: Dict[str, Tuple[int, int, int]] = {}
+_ASYNC_FILE_LOCKS: Dict[str, asyncio.Lock] = {}
+_IN_FLIGHT: Dict[str, Future] = {}
+
+############################################# CLASSES #############################################
+
+class Backend:
+    """Base class of configuration storages.
+
+    A storage holds json-like documents, each one identified by a
+    `/`-separated path: `'{cog}/{scope}/{ids...}'`, or `'{cog}/globals'`.
+    A folder is the path shared by a group of documents,
+    for example `'{cog}/member/{guild_id}'`.
+
+    Subclasses must implement `Backend.read`, `Backend._write`,
+    `Backend.list` and `Backend.walk`.
+
+    Partial updates are given to `Backend.patch` as serialized
+    operations (see `dump_op`), which are by default applied by
+    rewriting the whole document.
+
+    Bytes read and written are accounted to `Backend.metrics`, if set.
+
+    """
+    metrics: Metrics = None
+
+    def read(self, path: str) -> JSON_like_nottransposed:
+        """Returns the document stored at path.
+
+        Parameters
+            path: `str`
+                The document path
+
+        Returns
+            Union[`list`, `dict`]
+                The document
+
+        Raises
+            FileNotFoundError
+                If no document is stored at path
+
+        """
+        raise NotImplementedError
+
+    def read_all(
+        self, folder: str, names: List[str] = None
+    ) -> Dict[str, JSON_like_nottransposed]:
+        """Returns every document of folder.
+
+        Parameters
+            folder: `str`
+                The folder path
+            names: List[`str`] = `None`
+                The names of the documents to read, every one if not provided
+
+        Returns
+            Dict[`str`, Union[`list`, `dict`]]
+                The documents, keyed by name
+
+        """
+        documents = {}
+        for name in self.list(folder) if names is None else names:
+            try:
+                documents[name] = self.read(f"{folder}/{name}")
+            except FileNotFoundError: # deleted meanwhile
+                pass
+
+        return documents
+
+    def write(self, path: str, data: JSON_like_any):
+        """Stores data at path, replacing any previous document.
+
+        Parameters
+            path: `str`
+                The document path
+            data: Union[`list`, `dict`, `Objectify`]
+                The json-like data to store
+
+        """
+        self.write_document(path, self.dumps(data))
+
+    def write_document(self, path: str, document: bytes):
+        """Stores an already serialized json document at path,
+        replacing any previous document.
+
+        Parameters
+            path: `str`
+                The document path
+            document: `bytes`
+                The json document, as made by `Backend.dumps`
+
+        """
+        self._write(path, document)
+        self._account(path, written=len(document))
+
+    def _write(self, path: str, document: bytes):
+        raise NotImplementedError
+
+    def _account(self, path: str, read: int = 0, written: int = 0):
+        if self.metrics is not None:
+            self.metrics.add_bytes(path, read, written)
+
+    def patch(self, path: str, ops: List[str]) -> int:
+        """Applies serialized operations to the document stored at path.
+
+        Parameters
+            path: `str`
+                The document path
+            ops: List[`str`]
+                The operations, serialized by `dump_op`
+
+        Returns
+            `int`
+                The number of operations stored but not merged
+                into the document yet
+
+        """
+        data = self.read(path)
+        for op in ops:
+            apply_op(data, **json.loads(op))
+        self._write(path, document := codec.dumps(data))
+        self._account(path, written=len(document))
+
+        return 0
+
+    def list(self, folder: str) -> List[str]:
+        """Returns the names of the documents of folder.
+
+        Parameters
+            folder: `str`
+                The folder path
+
+        Returns
+            List[`str`]
+
+        """
+        raise NotImplementedError
+
+    def walk(self, cog: str) -> Iterator[str]:
+        """Yields the path of every document stored for cog,
+        always in the same order as long as documents don't change.
+
+        Parameters
+            cog: `str`
+                The `Cog` name
+
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Releases any resource held by the storage."""
+        pass
+
+    async def aread(self, path: str) -> JSON_like_nottransposed:
+        """Same as `Backend.read`, but runs on `EXECUTOR`."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(EXECUTOR, self.read, path)
+
+    async def aread_all(
+        self, folder: str, names: List[str] = None
+    ) -> Dict[str, JSON_like_nottransposed]:
+        """Same as `Backend.read_all`, but runs on `EXECUTOR`."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(EXECUTOR, self.read_all, folder, names)
+
+    async def awrite(self, path: str, data: JSON_like_any):
+        """Same as `Backend.write`, but runs on `EXECUTOR`.
+        Concurrent writes to the same path are applied one at a time,
+        in the order they were requested.
+
+        """
+        async with async_file_lock(path):
+            # serializing on the loop, as data may be mutated meanwhile
+            document = self.dumps(data)
+
+            await run_in_flight(path, self._write, path, document)
+            self._account(path, written=len(document))
+
+    async def apatch(self, path: str, ops: List[str]) -> int:
+        """Same as `Backend.patch`, but runs on `EXECUTOR`."""
+        async with async_file_lock(path):
+            return await run_in_flight(path, self.patch, path, ops)
+
+    @staticmethod
+    def dumps(data: JSON_like_any) -> bytes:
+        return codec.dumps(dictify(data))
+
+class JsonBackend(Backend):
+    """Stores every document in its own json file,
+    at `'{root}/{path}.json'`.
+
+    Every folder also holds a manifest file listing its documents
+    names, one per line, which is appended to whenever a document
+    is created, so that listing a folder is a single small read.
+    A missing manifest is rebuilt from the folder content.
+
+    Partial updates are appended to a `'{path}.log'` operations log,
+    replayed on read and merged on next full write.
+
+    Documents are replaced atomically, and synchronized to disk
+    by group, see `atomic_write`.
+
+    If shards is set, documents of `SHARDED_SCOPES` folders are
+    spread over that many subfolders, by id, so that big guilds
+    don't end up with huge directories:
+    `'{cog}/member/{guild_id}/{member_id % shards}/{member_id}.json'`.
+    Documents still stored in their unsharded location are moved on
+    first read, or all at once with `JsonBackend.reshard`, which is
+    also the way to change shards on an existing tree.
+
+    Parameters
+        root: `str` = `""`
+            The directory holding the `Cog` folders
+        shards: `int` = `0`
+            The number of subfolders per sharded folder, none if `0`
+
+    """
+    def __init__(self, root: str = "", shards: int = 0):
+        self.root = root
+        self.shards = shards
+
+        self._manifests: Dict[str, Set[str]] = {}
+        self._stamps: Dict[str, int] = {}
+        self._logs_sizes: Dict[str, int] = {}
+
+    def _base(self, path: str, sharded: bool = True) -> str:
+        """Returns the location of path document, without extension,
+        either sharded if applicable, or not.
+
+        """
+        if sharded and self.shards:
+            folder, _, name = path.rpartition("/")
+            if name.isdigit() and _in_scopes(folder, SHARDED_SCOPES):
+                path = f"{folder}/{int(name) % self.shards}/{name}"
+
+        return os.path.join(self.root, path)
+
+    def _file(self, path: str) -> str:
+        return self._base(path) + EXTENSION
+
+    def _log_file(self, path: str) -> str:
+        return self._base(path) + LOG_EXTENSION
+
+    def _manifest_file(self, folder: str) -> str:
+        return os.path.join(self.root, folder, MANIFEST)
+
+    def _manifest(self, folder: str, check: bool = False) -> Set[str]:
+        """Returns the names listed in folder manifest,
+        building the manifest if it doesn't exist yet, or again if
+        check is set and folder directories were modified by anything
+        but this backend since, such as documents being added or
+        deleted by hand.
+
+        """
+        names = self._manifests.get(folder)
+        if names is not None and not (check and self._stale(folder)):
+            return names
+
+        file = self._manifest_file(folder)
+        with file_lock(file):
+            current = self._manifests.get(folder)
+            if current is not None and current is not names:        # Loaded meanwhile
+                return current
+
+            stamp = self._stamp(folder)
+            try:
+                if names is not None:                               # Stale manifest
+                    raise FileNotFoundError
+                with open(file, 'r') as f:
+                    names = set(f.read().splitlines())
+                if max(stamp.values()) > os.stat(file).st_mtime_ns: # Modified while not running
+                    raise FileNotFoundError
+            except (FileNotFoundError, NotADirectoryError):
+                names = set(self._listdir(folder))
+                if names:
+                    atomic_write(file, "".join(f"{name}\n" for name in sorted(names)).encode())
+
+            self._manifests[folder] = names
+            self._restamp(folder, *stamp)
+
+        return names
+
+    def _stamp(self, folder: str) -> Dict[str, int]:
+        """Returns the modification times of folder directories,
+        which change whenever a document is added to or removed from
+        them, `0` for missing ones, by directory.
+
+        """
+        directory = os.path.join(self.root, folder)
+        directories = [directory]
+        if self.shards and _in_scopes(folder, SHARDED_SCOPES):
+            directories += [os.path.join(directory, str(shard)) for shard in range(self.shards)]
+
+        return {directory: _mtime(directory) for directory in directories}
+
+    def _stale(self, folder: str) -> bool:
+        """Returns whether any of folder directories changed since
+        recorded as matching its manifest.
+
+        """
+        return any(self._stamps.get(d) != mtime for d, mtime in self._stamp(folder).items())
+
+    def _restamp(self, folder: str, *directories: str):
+        """Records directories of folder, such as the ones a write
+        just changed, as matching its manifest, which modification
+        time is set accordingly so that it is still trusted on next
+        run. Lock of manifest must be held.
+
+        """
+        newest = 0
+        for directory in directories:
+            self._stamps[directory] = mtime = _mtime(directory)
+            newest = max(newest, mtime)
+
+        try:
+            os.utime(self._manifest_file(folder), ns=(newest, newest))
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+
+    def _listdir(self, folder: str) -> List[str]:
+        directory = os.path.join(self.root, folder)
+        try:
+            files = os.listdir(directory)
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+
+        if _in_scopes(folder, SHARDED_SCOPES):
+            for shard in [file for file in files if file.isdigit()]:
+                try:
+                    files += os.listdir(os.path.join(directory, shard))
+                except NotADirectoryError:
+                    pass
+
+        return [file[:-len(EXTENSION)] for file in files if file.endswith(EXTENSION)]
+
+    def _move(self, path: str, source: str, destination: str):
+        """Moves path document and operations log from source base
+        to destination base, unless a newer document already exists
+        at destination. Lock of path must be held.
+
+        """
+        if os.path.exists(destination + EXTENSION):
+            extensions = ()
+        else:
+            mkdir_p(os.path.dirname(destination))
+            extensions = (EXTENSION, LOG_EXTENSION)
+
+        for extension in extensions:
+            try:
+                os.replace(source + extension, destination + extension)
+            except FileNotFoundError:
+                pass
+            else:
+                SYNC_SCHEDULER.schedule(destination + extension)
+
+        for extension in (EXTENSION, LOG_EXTENSION):
+            try:
+                os.remove(source + extension)
+            except FileNotFoundError:
+                pass
+
+        self._logs_sizes.pop(path, None)
+
+    def read(self, path: str) -> JSON_like_nottransposed:
+        with file_lock(file := self._file(path)):
+            try:
+                f = open(file, 'rb')
+            except FileNotFoundError: # may still be stored unsharded
+                unsharded = self._base(path, sharded=False)
+                if unsharded + EXTENSION == file or not os.path.exists(unsharded + EXTENSION):
+                    folder, _, name = path.rpartition("/")
+                    self._manifests.get(folder, set()).discard(name)  # Deleted meanwhile
+                    raise
+                self._move(path, unsharded, self._base(path))
+                f = open(file, 'rb')
+
+            with f:
+                document = f.read()
+            data = codec.loads(document)
+
+            try:
+                with open(log_file := self._log_file(path), 'r') as f:
+                    log = f.read()
+            except FileNotFoundError:
+                log = ""
+            ops = log.splitlines()
+            self._account(path, read=len(document) + len(log))
+
+            for n, op in enumerate(ops):
+                try:
+                    op = json.loads(op)
+                except ValueError: # interrupted append, dropping it
+                    ops = ops[:n]
+                    atomic_write(log_file, "".join(f"{op}\n" for op in ops).encode())
+                    break
+                else:
+                    apply_op(data, **op)
+
+            self._logs_sizes[path] = len(ops)
+
+        return data
+
+    def _write(self, path: str, document: bytes):
+        folder, _, name = path.rpartition("/")
+        names = self._manifest(folder)
+
+        with file_lock(file := self._file(path)):
+            atomic_write(file, document)
+
+            # operations log is now merged in file
+            if self._logs_sizes.pop(path, None) != 0:
+                try:
+                    os.remove(self._log_file(path))
+                except FileNotFoundError:
+                    pass
+
+        with file_lock(file := self._manifest_file(folder)):
+            if name not in names:
+                with safe_open(file, 'a') as f:
+                    f.write(f"{name}\n")
+                SYNC_SCHEDULER.schedule(file)
+                names.add(name)
+
+            # own change, manifest is still up to date
+            if self._manifests.get(folder) is names:
+                self._restamp(folder, os.path.dirname(file), os.path.dirname(self._file(path)))
+
+    def patch(self, path: str, ops: List[str]) -> int:
+        with file_lock(self._file(path)):
+            with safe_open(log_file := self._log_file(path), 'a') as f:
+                f.write(log := "".join(f"{op}\n" for op in ops))
+            SYNC_SCHEDULER.schedule(log_file)
+            self._account(path, written=len(log))
+
+            size = self._logs_sizes[path] = self._logs_sizes.get(path, 0) + len(ops)
+
+        return size
+
+    def list(self, folder: str) -> List[str]:
+        return list(self._manifest(folder, check=True))
+
+    def walk(self, cog: str) -> Iterator[str]:
+        for path, _ in self._walk(cog):
+            yield path
+
+    def path_of(self, file: str) -> str:
+        """Returns the path of the document stored in file,
+        or `None` if file doesn't store any document.
+
+        Parameters
+            file: `str`
+                The file location
+
+        Returns
+            `str`
+
+        """
+        if not file.endswith(EXTENSION):
+            return None
+
+        relative = os.path.relpath(file, self.root or os.curdir).replace(os.sep, "/")
+        folder, _, name = relative[:-len(EXTENSION)].rpartition("/")
+        parent, _, shard = folder.rpartition("/")
+        if shard.isdigit() and _in_scopes(parent, SHARDED_SCOPES):
+            folder = parent
+
+        return f"{folder}/{name}" if folder and not folder.startswith("..") else None
+
+    def _walk(self, cog: str) -> Iterator[Tuple[str, str]]:
+        """Yields the path and current base of every document of cog,
+        whichever their layout is, always in the same order.
+
+        """
+        root = os.path.join(self.root, cog)
+        for directory, directories, files in os.walk(root):
+            directories.sort()
+            folder = os.path.relpath(directory, self.root or os.curdir).replace(os.sep, "/")
+            parent, _, shard = folder.rpartition("/")
+            if shard.isdigit() and _in_scopes(parent, SHARDED_SCOPES):
+                folder = parent
+
+            for file in sorted(files):
+                if file.endswith(EXTENSION):
+                    base = os.path.join(directory, file[:-len(EXTENSION)])
+                    yield f"{folder}/{file[:-len(EXTENSION)]}", base
+
+    def reshard(self, cog: str) -> int:
+        """Moves every document of cog which isn't stored according
+        to `self.shards` yet. Safe to run while documents are in use
+        by this backend.
+
+        Parameters
+            cog: `str`
+                The `Cog` name
+
+        Returns
+            `int`
+                The number of moved documents
+
+        """
+        count = 0
+        shards = set()
+        for path, base in list(self._walk(cog)):
+            with file_lock(self._file(path)):
+                if os.path.normpath(base) != os.path.normpath(self._base(path)):
+                    self._move(path, base, self._base(path))
+                    count += 1
+
+                    if os.path.normpath(base) != os.path.normpath(self._base(path, sharded=False)):
+                        shards.add(os.path.dirname(base))
+
+        # removing emptied shards, if any
+        for shard in shards:
+            try:
+                os.rmdir(shard)
+            except OSError:
+                pass
+
+        return count
+
+    def close(self):
+        SYNC_SCHEDULER.sync()
+
+class PackedBackend(JsonBackend):
+    """Same as `JsonBackend`, but stores all documents of a
+    `PACKED_SCOPES` folder in a single pack file instead,
+    such as `'{cog}/member/{guild_id}.pack'`, which is way cheaper
+    for many tiny documents.
+
+    A pack holds one `'{name} {document}'` record per line, after a
+    random header line, and is only appended to: a written document supersedes its previous
+    records, which are dropped once they outweigh live ones.
+    Records offsets are indexed in memory, so reading a document
+    is a single seek, and reading a whole folder a single read.
+    The index is saved to `'{cog}/member/{guild_id}.idx'` on close
+    and compaction, along with the pack header and size it covers,
+    so that only records appended afterwards have to be scanned
+    on load.
+
+    Documents stored as separate files, before this backend was
+    used, are still read, and packed on their next write.
+
+    Parameters
+        root: `str` = `""`
+            The directory holding the `Cog` folders
+
+    """
+    def __init__(self, root: str = ""):
+        super().__init__(root)
+
+        self._indexes: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._garbage: Dict[str, int] = {}
+        self._tokens: Dict[str, str] = {}
+
+    def _pack_file(self, folder: str) -> str:
+        return os.path.join(self.root, folder + PACK_EXTENSION)
+
+    def _index_file(self, folder: str) -> str:
+        return os.path.join(self.root, folder + INDEX_EXTENSION)
+
+    def _index(self, folder: str) -> Dict[str, Tuple[int, int]]:
+        """Returns the offset and length of every document of folder
+        pack, loading the index if not loaded yet. Lock of folder
+        pack must be held.
+
+        """
+        try:
+            return self._indexes[folder]
+        except KeyError:
+            pass
+
+        try:
+            with open(self._pack_file(folder), 'rb') as f:
+                header = f.readline()
+        except FileNotFoundError:
+            header = b""
+        token = self._tokens[folder] = header[1:].strip().decode()
+
+        index = {}
+        start = 0
+        try:
+            with open(self._index_file(folder), 'r') as f:
+                header, *entries = f.read().splitlines()
+            # index is only valid for the pack it was saved with
+            index_token, size = header.split()
+            if token and index_token == token\
+               and int(size) <= os.path.getsize(self._pack_file(folder)):
+                for entry in entries:
+                    name, offset, length = entry.split()
+                    index[name] = (int(offset), int(length))
+                start = int(size)
+        except (FileNotFoundError, ValueError): # no valid index, scanning it all
+            index = {}
+            start = 0
+
+        self._garbage[folder] = 0
+        self._scan(folder, index, start)
+
+        return self._indexes.setdefault(folder, index)
+
+    def _scan(self, folder: str, index: Dict[str, Tuple[int, int]], start: int):
+        """Indexes folder pack records from offset start."""
+        try:
+            with open(file := self._pack_file(folder), 'rb') as f:
+                f.seek(start)
+                records = f.read()
+        except FileNotFoundError:
+            return
+
+        offset = start
+        for record in records.splitlines(keepends=True):
+            if not record.endswith(b"\n"): # interrupted append, dropping it
+                with open(file, 'r+b') as f:
+                    f.truncate(offset)
+                break
+
+            if not record.startswith(b"#"): # else pack header
+                name, _, document = record.partition(b" ")
+                name = name.decode()
+                if name in index:
+                    self._garbage[folder] += index[name][1]
+                index[name] = (offset + len(name) + 1, len(document) - 1)
+            offset += len(record)
+
+    def _save_index(self, folder: str):
+        index = self._indexes[folder]
+        try:
+            size = os.path.getsize(self._pack_file(folder))
+        except FileNotFoundError:
+            return
+
+        lines = [f"{self._tokens[folder]} {size}\n"]
+        lines += [f"{name} {offset} {length}\n" for name, (offset, length) in index.items()]
+        atomic_write(self._index_file(folder), "".join(lines).encode())
+
+    def _header(self, folder: str) -> bytes:
+        """Returns a new pack header for folder, identifying
+        the pack indexes are saved for.
+
+        """
+        token = self._tokens[folder] = os.urandom(8).hex()
+        return f"#{token}\n".encode()
+
+    def _compact(self, folder: str):
+        """Rewrites folder pack without superseded records.
+        Lock of folder pack must be held.
+
+        """
+        index = self._indexes[folder]
+        with open(file := self._pack_file(folder), 'rb') as f:
+            records = f.read()
+
+        pack = [self._header(folder)]
+        offset = len(pack[0])
+        for name, (start, length) in sorted(index.items()):
+            record = f"{name} ".encode() + records[start:start + length] + b"\n"
+            index[name] = (offset + len(name) + 1, length)
+            pack.append(record)
+            offset += len(record)
+
+        atomic_write(file, b"".join(pack))
+        self._garbage[folder] = 0
+        self._save_index(folder)
+
+    def read(self, path: str) -> JSON_like_nottransposed:
+        folder, _, name = path.rpartition("/")
+        if not _in_scopes(folder, PACKED_SCOPES):
+            return super().read(path)
+
+        with file_lock(self._pack_file(folder)):
+            for _ in range(2):
+                try:
+                    offset, length = self._index(folder)[name]
+                except KeyError:
+                    break
+
+                with open(self._pack_file(folder), 'rb') as f:
+                    f.seek(offset - len(name) - 1)
+                    record = f.read(len(name) + 1 + length)
+
+                if record.startswith(f"{name} ".encode()):
+                    self._account(path, read=length)
+                    return codec.loads(record[len(name) + 1:])
+
+                # pack changed behind index, reindexing it all
+                del self._indexes[folder]
+                try:
+                    os.remove(self._index_file(folder))
+                except FileNotFoundError:
+                    pass
+
+        return super().read(path)
+
+    def read_all(
+        self, folder: str, names: List[str] = None
+    ) -> Dict[str, JSON_like_nottransposed]:
+        if not _in_scopes(folder, PACKED_SCOPES):
+            return super().read_all(folder, names)
+
+        with file_lock(self._pack_file(folder)):
+            index = dict(self._index(folder))
+            try:
+                with open(self._pack_file(folder), 'rb') as f:
+                    records = f.read()
+            except FileNotFoundError:
+                records = b""
+        self._account(folder, read=len(records))
+
+        if names is None:
+            names = self.list(folder)
+
+        documents = {
+            name: codec.loads(records[offset:offset + length])
+            for name in names if name in index
+            for offset, length in (index[name],)
+        }
+        unpacked = [name for name in names if name not in index]
+        if unpacked:
+            documents.update(super().read_all(folder, unpacked))
+
+        return documents
+
+    def _write(self, path: str, document: bytes):
+        folder, _, name = path.rpartition("/")
+        if not _in_scopes(folder, PACKED_SCOPES):
+            return super()._write(path, document)
+
+        with file_lock(file := self._pack_file(folder)):
+            index = self._index(folder)
+            with safe_open(file, 'ab') as f:
+                if not f.tell(): # new pack
+                    f.write(self._header(folder))
+                offset = f.tell()
+                size = offset + f.write(f"{name} ".encode() + document + b"\n")
+            SYNC_SCHEDULER.schedule(file)
+
+            if name in index:
+                self._garbage[folder] += index[name][1]
+            index[name] = (offset + len(name) + 1, len(document))
+
+            # dropping any previous unpacked version
+            if name in self._manifest(folder):
+                for extension in (EXTENSION, LOG_EXTENSION):
+                    try:
+                        os.remove(self._base(path) + extension)
+                    except FileNotFoundError:
+                        pass
+
+            garbage = self._garbage[folder]
+            if garbage > max(size - garbage, PACK_COMPACT_BYTES):
+                self._compact(folder)
+
+    def patch(self, path: str, ops: List[str]) -> int:
+        folder, _, _ = path.rpartition("/")
+        if not _in_scopes(folder, PACKED_SCOPES):
+            return super().patch(path, ops)
+
+        # tiny documents, rewriting them is cheaper than logging
+        return Backend.patch(self, path, ops)
+
+    def list(self, folder: str) -> List[str]:
+        if not _in_scopes(folder, PACKED_SCOPES):
+            return super().list(folder)
+
+        with file_lock(self._pack_file(folder)):
+            names = set(self._index(folder))
+
+        return list(names.union(super().list(folder)))
+
+    def walk(self, cog: str) -> Iterator[str]:
+        paths = set(super().walk(cog))
+        for scope in PACKED_SCOPES:
+            try:
+                files = os.listdir(os.path.join(self.root, cog, scope))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+            for file in files:
+                if file.endswith(PACK_EXTENSION):
+                    folder = f"{cog}/{scope}/{file[:-len(PACK_EXTENSION)]}"
+                    with file_lock(self._pack_file(folder)):
+                        paths.update(f"{folder}/{name}" for name in self._index(folder))
+
+        yield from sorted(paths)
+
+    def close(self):
+        for folder in list(self._indexes):
+            with file_lock(self._pack_file(folder)):
+                self._save_index(folder)
+        super().close()
+
+class SqliteBackend(Backend):
+    """Stores every document in a single SQLite database,
+    with one table per scope.
+
+    The database runs in WAL mode, and every query is a constant
+    parametrized statement, so that sqlite3 statement cache keeps
+    them prepared.
+
+    Parameters
+        file: `str` = `"config.sqlite3"`
+            The path to database file
+
+    """
+    COLUMNS = "(cog TEXT, folder TEXT, name TEXT, data TEXT, PRIMARY KEY (cog, folder, name))"
+
+    def __init__(self, file: str = "config.sqlite3"):
+        self.file = file
+
+        mkdir_p(os.path.dirname(file))
+        self._connection = sqlite3.connect(
+            file,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        self._tables = self._list_tables()
+
+    def _list_tables(self) -> set:
+        query = "SELECT name FROM sqlite_master WHERE type='table'"
+        return {name for name, in self._connection.execute(query)}
+
+    def _table(self, scope: str, create: bool = False) -> str:
+        if not scope.isidentifier():
+            raise ValueError(f"Invalid scope name: {scope}")
+
+        if create and scope not in self._tables:
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS "{scope}" {self.COLUMNS}')
+            self._tables.add(scope)
+
+        return f'"{scope}"'
+
+    @staticmethod
+    def _split(path: str) -> Tuple[str, str, str, str]:
+        """Splits path into cog, scope, folder and name."""
+        cog, scope, *keys = path.split("/")
+        *folder, name = keys or [""]
+        return cog, scope, "/".join(folder), name
+
+    def read(self, path: str) -> JSON_like_nottransposed:
+        cog, scope, folder, name = self._split(path)
+        with self._lock:
+            if scope not in self._tables:
+                raise FileNotFoundError(path)
+
+            row = self._connection.execute(
+                f"SELECT data FROM {self._table(scope)} WHERE cog=? AND folder=? AND name=?",
+                (cog, folder, name)
+            ).fetchone()
+
+        if row is None:
+            raise FileNotFoundError(path)
+        self._account(path, read=len(row[0]))
+        return codec.loads(row[0])
+
+    def read_all(
+        self, folder: str, names: List[str] = None
+    ) -> Dict[str, JSON_like_nottransposed]:
+        # a single query, even if only some documents are requested
+        cog, scope, *keys = folder.split("/")
+        with self._lock:
+            if scope not in self._tables:
+                return {}
+
+            rows = self._connection.execute(
+                f"SELECT name, data FROM {self._table(scope)} WHERE cog=? AND folder=?",
+                (cog, "/".join(keys))
+            ).fetchall()
+
+        self._account(folder, read=sum(len(data) for _, data in rows))
+        if names is not None:
+            names = set(names)
+            rows = [(name, data) for name, data in rows if name in names]
+
+        return {name: codec.loads(data) for name, data in rows}
+
+    def _write(self, path: str, document: bytes):
+        cog, scope, folder, name = self._split(path)
+        with self._lock:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self._table(scope, create=True)} VALUES (?, ?, ?, ?)",
+                (cog, folder, name, document)
+            )
+
+    def list(self, folder: str) -> List[str]:
+        cog, *scopes = folder.split("/")
+        if not scopes: # globals are the only documents at cog level
+            return ["globals"] if self._exists(f"{cog}/globals") else []
+
+        scope, *keys = scopes
+        with self._lock:
+            if scope not in self._tables:
+                return []
+
+            rows = self._connection.execute(
+                f"SELECT name FROM {self._table(scope)} WHERE cog=? AND folder=?",
+                (cog, "/".join(keys))
+            ).fetchall()
+
+        return [name for name, in rows]
+
+    def walk(self, cog: str) -> Iterator[str]:
+        with self._lock:
+            rows = []
+            for scope in sorted(self._tables):
+                rows += [
+                    (scope, folder, name) for folder, name in self._connection.execute(
+                        f"SELECT folder, name FROM {self._table(scope)} WHERE cog=? "
+                        f"ORDER BY folder, name",
+                        (cog,)
+                    )
+                ]
+
+        for scope, folder, name in rows:
+            yield "/".join(part for part in (cog, scope, folder, name) if part)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _exists(self, path: str) -> bool:
+        try:
+            self.read(path)
+        except FileNotFoundError:
+            return False
+        else:
+            return True
+
+class SyncScheduler:
+    """Group commits the `os.fsync` calls made durable writes need.
+
+    Written files are only scheduled for synchronization, then
+    synchronized all at once by a background thread, interval
+    seconds after the first one was scheduled, along with their
+    directories, so that any number of writes to the same files
+    and folders within that window only costs one `os.fsync` call
+    per file and per folder.
+
+    Replacements of files by temporary ones are committed by group
+    as well, as soon as no other temporary file is being written,
+    see `SyncScheduler.preparing`: every pending temporary file is
+    synchronized, then replaces its file, then their directories
+    are synchronized, so that a file is never replaced by content
+    which isn't on disk yet. Concurrent writes, such as those of
+    `Cache.flush`, thus share a single round.
+
+    The number of rounds and of `os.fsync` calls made so far are
+    kept in `SyncScheduler.rounds` and `SyncScheduler.fsyncs`.
+
+    Parameters
+        interval: `float` = `SYNC_INTERVAL`
+            The time to wait for other writes before synchronizing,
+            in seconds
+
+    """
+    def __init__(self, interval: float = SYNC_INTERVAL):
+        self.interval = interval
+
+        self.rounds = 0
+        self.fsyncs = 0
+
+        self._pending: Set[str] = set()
+        self._replacements: List[_Replacement] = []
+        self._preparing = 0
+        self._condition = threading.Condition()
+        self._thread: threading.Thread = None
+
+    def schedule(self, path: str):
+        """Schedules the synchronization of path and its directory.
+
+        Parameters
+            path: `str`
+                The path of the written file
+
+        """
+        with self._condition:
+            self._pending.add(path)
+            self._wake()
+
+    @contextmanager
+    def preparing(self) -> Iterator[None]:
+        """Returns a context manager holding back the next round of
+        replacements while a temporary file is written, so that its
+        replacement, submitted within the context with
+        `SyncScheduler.submit`, joins the round. Rounds are held back
+        for no longer than interval seconds.
+
+        """
+        with self._condition:
+            self._preparing += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._preparing -= 1
+                self._condition.notify()
+
+    def commit(self, temp: str, path: str):
+        """Replaces path with temp file once synchronized, along with
+        every other pending replacement, then synchronizes path
+        directory. Blocks until done, which is as soon as no other
+        temporary file is being prepared.
+
+        Parameters
+            temp: `str`
+                The path of the written temporary file
+            path: `str`
+                The path of the file to replace
+
+        Raises
+            OSError
+                If temp couldn't be synchronized or couldn't replace path
+
+        """
+        self.submit(temp, path).wait()
+
+    def submit(self, temp: str, path: str) -> "_Replacement":
+        """Same as `SyncScheduler.commit`, but returns the pending
+        replacement right away instead of waiting for it.
+
+        Parameters
+            temp: `str`
+                The path of the written temporary file
+            path: `str`
+                The path of the file to replace
+
+        Returns
+            `_Replacement`
+
+        """
+        replacement = _Replacement(temp, path)
+        with self._condition:
+            self._replacements.append(replacement)
+            self._wake()
+
+        return replacement
+
+    def _wake(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run,
+                name="config-sync",
+                daemon=True
+            )
+            self._thread.start()
+        self._condition.notify()
+
+    def sync(self):
+        """Synchronizes every scheduled file, and commits every
+        pending replacement, right away.
+
+        """
+        with self._condition:
+            paths, self._pending = self._pending, set()
+            replacements, self._replacements = self._replacements, []
+            if paths or replacements:
+                self.rounds += 1
+
+        directories = set()
+        try:
+            for replacement in replacements:
+                try:
+                    self._fsync(replacement.temp)
+                    os.replace(replacement.temp, replacement.path)
+                except OSError as error:
+                    replacement.error = error
+                else:
+                    directories.add(os.path.dirname(replacement.path) or os.curdir)
+
+            for path in paths:
+                directories.add(os.path.dirname(path) or os.curdir)
+                try:
+                    self._fsync(path)
+                except FileNotFoundError: # removed meanwhile
+                    continue
+
+            for directory in directories:
+                try:
+                    self._fsync(directory)
+                except OSError: # directories can't be opened on some systems
+                    pass
+
+        finally:
+            for replacement in replacements:
+                replacement.done.set()
+
+    def _fsync(self, path: str):
+        _fsync(path)
+        self.fsyncs += 1
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._replacements:
+                    self._condition.wait()
+                # replacements only wait for the ones being prepared, others are gathered
+                self._condition.wait_for(
+                    lambda: self._replacements and not self._preparing, self.interval
+                )
+
+            try:
+                self.sync()
+            except OSError as error:
+                print(f"STORAGE: sync failed: {error}")
+
+class _Replacement:
+    """A replacement of path by temp file pending commit,
+    see `SyncScheduler.commit`.
+
+    """
+    __slots__ = ("temp", "path", "done", "error")
+
+    def __init__(self, temp: str, path: str):
+        self.temp = temp
+        self.path = path
+        self.done = threading.Event()
+        self.error: OSError = None
+
+    def wait(self):
+        """Blocks until committed.
+
+        Raises
+            OSError
+                If temp couldn't be synchronized or couldn't replace path
+
+        """
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+
+############################################ FUNCTIONS ############################################
+
+def _in_scopes(folder: str, scopes: Tuple[str]) -> bool:
+    """Returns whether folder is a guild folder of one of scopes,
+    such as `'{cog}/member/{guild_id}'`.
+
+    """
+    parts = folder.split("/")
+    return len(parts) == 3 and parts[1] in scopes
+
+def mkdir_p(path: str):
+    """Safely creates path to desired location if it doesn't exist.
+
+    Parameters
+        path: `str`
+            The path to desired location
+
+    """
+    if path:
+        try:
+            os.makedirs(path)
+        except OSError as exc:
+            if exc.errno == errno.EEXIST and os.path.isdir(path):
+                pass
+            else:
+                raise OSError("Couldn't create file or directory.")
+
+def safe_open(path: str, mode: str) -> open:
+    """Same as the `open` function, but safely creates file before.
+
+    """
+    mkdir_p(os.path.dirname(path))
+    return open(path, mode=mode)
+
+def atomic_write(path: str, document: bytes):
+    """Replaces the content of file path with document, so that
+    the file is never seen truncated or partially written, even
+    after a crash: document is written to a temporary file which
+    replaces path once synchronized, by group with other writes,
+    see `SyncScheduler.commit`.
+
+    Calls for a same path must not run concurrently, see `file_lock`.
+
+    Parameters
+        path: `str`
+            Desired file location path
+        document: `bytes`
+            The new file content
+
+    """
+    # submitted while preparing, so that the round can't start without it
+    with SYNC_SCHEDULER.preparing():
+        with safe_open(temp := path + TEMP_EXTENSION, 'wb') as file:
+            file.write(document)
+
+        # recorded before the rename, which watchers may report right away
+        _WRITTEN_STATS[os.path.normpath(path)] = _stat(temp)
+        replacement = SYNC_SCHEDULER.submit(temp, path)
+
+    replacement.wait()
+
+def written(path: str) -> bool:
+    """Returns whether file path is still as last written by
+    `atomic_write`, which tells own writes from external ones.
+
+    """
+    path = os.path.normpath(path)
+    return path in _WRITTEN_STATS and _WRITTEN_STATS[path] == _stat(path)
+
+def _fsync(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _mtime(path: str) -> int:
+    """Returns the modification time of path, `0` if missing."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return 0
+
+def _stat(path: str) -> Tuple[int, int, int]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+def file_lock(path: str) -> threading.Lock:
+    """Returns the lock serializing file accesses to path
+    across threads.
+
+    """
+    try:
+        return _FILE_LOCKS[path]
+    except KeyError:
+        return _FILE_LOCKS.setdefault(path, threading.Lock())
+
+def async_file_lock(path: str) -> asyncio.Lock:
+    """Returns the lock serializing asynchronous writes to path,
+    so that they reach the file in the order they were requested.
+
+    """
+    try:
+        return _ASYNC_FILE_LOCKS[path]
+    except KeyError:
+        return _ASYNC_FILE_LOCKS.setdefault(path, asyncio.Lock())
+
+def run_in_flight(path: str, function: Callable[..., Any], *args: Any) -> Awaitable[Any]:
+    """Runs function on `EXECUTOR` as the write of path in flight,
+    which synchronous writes of path wait for, see `settle`.
+    Must be called holding `async_file_lock` of path.
+
+    Returns
+        Awaitable[Any]
+            The result of function
+
+    """
+    future = _IN_FLIGHT[path] = EXECUTOR.submit(function, *args)
+    future.add_done_callback(partial(_landed, path))
+    return asyncio.wrap_future(future)
+
+def _landed(path: str, future: Future):
+    if _IN_FLIGHT.get(path) is future:
+        del _IN_FLIGHT[path]
+
+def settle(path: str):
+    """Waits for the asynchronous write of path in flight, if any,
+    so that it can't land after, and overwrite, a synchronous one.
+
+    """
+    future = _IN_FLIGHT.get(path)
+    if future is not None:
+        wait((future,))
+
+def load(
+    path: str, if_error: Union[list, dict] = [], to_object: Type[JSON_like] = None
+) -> JSON_like_any:
+    """Loads data from file path, as a json data file.
+
+    Parameters
+        path: `str`
+            Desired file location path
+        if_error: Union[`list`, `dict`] = `[]`
+            Value to return if file doesn't exist
+        to_object: Union[List[`Objectify`], `Objectify`, `type`] = `None`
+            Automatically casts data to type if given, or
+            keeps data as a simple `dict` or `list`.
+
+    Returns
+        Union[List[`Objectify`], `Objectify`, `dict`, `list`]
+            The extracted data from requested path
+
+    """
+    try:
+        with file_lock(path), open(path, 'rb') as file:
+            data = codec.load(file)
+    except FileNotFoundError or NotADirectoryError:
+        data = deepcopy(if_error)
+        write(path, data)
+
+    return objectify(data, to_object) if to_object else data
+
+def write(path: str, data: JSON_like_any):
+    """Writes data to path, as a json data file.
+
+    Parameters
+        path: `str`
+            Desired file location path
+        data: Union[`list`, `dict`, `Objectify`]
+            The json-like data to write in file
+
+    """
+    document = codec.dumps(dictify(data))
+    settle(path)
+    _write_document(path, document)
+
+def _write_document(path: str, document: bytes):
+    with file_lock(path):
+        atomic_write(path, document)
+
+async def aload(
+    path: str, if_error: Union[list, dict] = [], to_object: Type[JSON_like] = None
+) -> JSON_like_any:
+    """Same as `load`, but reads the file on `EXECUTOR`.
+
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        EXECUTOR,
+        partial(load, path, if_error=if_error, to_object=to_object)
+    )
+
+async def awrite(path: str, data: JSON_like_any):
+    """Same as `write`, but writes the file on `EXECUTOR`.
+    Concurrent writes to the same path are applied one at a time,
+    in the order they were requested.
+
+    """
+    async with async_file_lock(path):
+        # serializing on the loop, as data may be mutated meanwhile
+        document = codec.dumps(dictify(data))
+
+        await run_in_flight(path, _write_document, path, document)
+
+def apply_op(data: Any, op: str, keys: List[Union[int, str]], value: Any):
+    """Applies a partial update operation to data.
+
+    Parameters
+        data: Union[`list`, `dict`, `Objectify`]
+            The data to edit
+        op: `str`
+            The operation type: `UPDATE` or `APPEND`
+        keys: List[Union[`int`, `str`]]
+            The keys leading to edited element
+        value: Any
+            The value to set or to append
+
+    """
+    *keys, last = keys
+    for key in keys:
+        data = data[key]
+
+    if op == UPDATE:
+        data[last] = value
+    elif op == APPEND:
+        data[last].append(value)
+    else:
+        raise ValueError(f"Unknown operation: {op}")
+
+def dump_op(op: str, keys: List[Union[int, str]], value: Any) -> str:
+    """Serializes a partial update operation, see `apply_op`."""
+    return json.dumps({"op": op, "keys": keys, "value": value}, default=dictify)
+
+def migrate(source: Backend, destination: Backend, cogs: Iterable[str]) -> int:
+    """Copies every document of given cogs from source to destination.
+
+    Parameters
+        source: `Backend`
+            The storage to read documents from
+        destination: `Backend`
+            The storage to write documents to
+        cogs: Iterable[`str`]
+            The names of the `Cog` to migrate
+
+    Returns
+        `int`
+            The number of migrated documents
+
+    """
+    count = 0
+    for cog in cogs:
+        for path in source.walk(cog):
+            destination._write(path, codec.dumps(source.read(path)))
+            count += 1
+
+    return count
+
+############################################# GLOBALS #############################################
+
+SYNC_SCHEDULER = SyncScheduler()
+atexit.register(SYNC_SCHEDULER.sync)
+
+############################################## MAIN ###############################################
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migrates cogs configuration between storages.")
+    parser.add_argument("direction", choices=(
+        "json-to-sqlite", "sqlite-to-json", "json-to-packed", "packed-to-json", "reshard"
+    ))
+    parser.add_argument("cogs", nargs="+", help="names of the cogs to migrate")
+    parser.add_argument("--root", default="", help="json files root directory")
+    parser.add_argument("--shards", type=int, default=0, help="json member folders shards")
+    parser.add_argument("--database", default="config.sqlite3", help="sqlite database file")
+    args = parser.parse_args()
+
+    json_backend = JsonBackend(args.root, shards=args.shards)
+    if args.direction == "reshard":
+        count = sum(json_backend.reshard(cog) for cog in args.cogs)
+    elif args.direction in ("json-to-packed", "packed-to-json"):
+        packed_backend = PackedBackend(args.root)
+        if args.direction == "json-to-packed":
+            count = migrate(json_backend, packed_backend, args.cogs)
+        else:
+            count = migrate(packed_backend, json_backend, args.cogs)
+        packed_backend.close()
+    else:
+        sqlite_backend = SqliteBackend(args.database)
+        if args.direction == "json-to-sqlite":
+            count = migrate(json_backend, sqlite_backend, args.cogs)
+        else:
+            count = migrate(sqlite_backend, json_backend, args.cogs)
+        sqlite_backend.close()
+    json_backend.close()
+
+    print(f"Migrated {count} documents")
@@ -1,6 +1,8 @@
 ############################################# IMPORTS #############################################
 
 from datetime import datetime as dt
+from functools import lru_cache
+from itertools import islice
 from typing import (
     _GenericAlias,
     Any,
@@ -26,6 +28,8 @@ import asyncio
 ExtendedType = Union[type, _GenericAlias]
 One_D_Iterable = Union[list, tuple, set, frozenset]
 
+TYPE_CHECKS_CACHE_SIZE = 4096
+
 ############################################# CLASSES #############################################
 
 class ImprovedList(list):
@@ -80,7 +84,19 @@ def isofclass(
     works with any `typing._GenericAlias` type.
     Useful for more complex class checking.
 
+    Results are memoized for the last `TYPE_CHECKS_CACHE_SIZE`
+    checked pairs, as same classes are checked over and over.
+
     """
+    try:
+        return _isofclass(cls, type_or_tuple)
+    except TypeError: # unhashable types can't be memoized
+        return _isofclass.__wrapped__(cls, type_or_tuple)
+
+@lru_cache(maxsize=TYPE_CHECKS_CACHE_SIZE)
+def _isofclass(
+    cls: ExtendedType, type_or_tuple: Type[Union[ExtendedType, Tuple[ExtendedType]]]
+) -> bool:
     # converting type parameter to tuple if single value given
     if isinstance(type_or_tuple, tuple):
         types = type_or_tuple
@@ -90,7 +106,7 @@ def isofclass(
     # verifying if cls is a subclass of at least one of given classes
     for type_ in types:
         # if both are typing classes
-        if type(cls) == _GenericAlias and type(type_) == _GenericAlias:
+        if isinstance(cls, _GenericAlias) and isinstance(type_, _GenericAlias):
             # cls and type_ have same base and same length
             if (cls_origin := get_origin(cls)) == (type_origin := get_origin(type_))\
                and len(cls_args := get_args(cls)) == len(type_args := get_args(type_)):
@@ -100,7 +116,7 @@ def isofclass(
                         return True
 
         # else if both are common classes
-        elif type(cls) != _GenericAlias and type(type_) != _GenericAlias:
+        elif not isinstance(cls, _GenericAlias) and not isinstance(type_, _GenericAlias):
             # and cls is subclass of type_, then True
             if issubclass(cls, type_):
                 return True
@@ -108,11 +124,29 @@ def isofclass(
     # every other case if False
     return False
 
-def isoftype(instance: Any, type_or_tuple: Type[Union[ExtendedType, Tuple[ExtendedType]]]) -> bool:
+def isoftype(
+    instance: Any, type_or_tuple: Type[Union[ExtendedType, Tuple[ExtendedType]]],
+    sample: int = None
+) -> bool:
     """An alternative of the `isinstance` function which
     works with any `typing._GenericAlias` type.
     Useful for more complex type checking.
 
+    Components of an instance are only checked once per distinct
+    type when `typing` arguments are common classes, and sample
+    allows checking only the first components of big instances.
+
+    Parameters
+        instance: Any
+            The instance to check
+        type_or_tuple: Union[`ExtendedType`, Tuple[`ExtendedType`]]
+            The type(s) instance must be of
+        sample: `int` = `None`
+            The maximum number of components to check, all if `None`
+
+    Returns
+        `bool`
+
     """
     # converting type parameter to tuple if single value given
     if isinstance(type_or_tuple, tuple):
@@ -123,11 +157,25 @@ def isoftype(instance: Any, type_or_tuple: Type[Union[ExtendedType, Tuple[Extend
     # verifying if instance is an instance of at least one of given classes
     for type_ in types:
         # typing class case
-        if type(type_) == _GenericAlias:
+        if isinstance(type_, _GenericAlias):
+            args = get_args(type_)
+
+            # union case, instance is of at least one of its arguments
+            if get_origin(type_) is Union:
+                if isoftype(instance, args, sample):
+                    return True
+
             # instance has same base
-            if isoftype(instance, get_origin(type_)):
+            elif isoftype(instance, get_origin(type_)):
+                components = instance if sample is None else islice(instance, sample)
+
+                # nested typing classes, so checking every component
+                if any(isinstance(arg, _GenericAlias) for arg in args):
+                    if all(isoftype(x, args, sample) for x in components):
+                        return True
+
                 # all instance components have same type as type_ arguments, so True
-                if all(isoftype(x, get_args(type_)) for x in instance):
+                elif all(_issubclass(t, args) for t in {type(x) for x in components}):
                     return True
 
         # else type_ is a common class, so basic isinstance checking
@@ -156,6 +204,10 @@ def revert_dict(d: Dict[Any, One_D_Iterable]) -> Dict[Any, Set[Any]]:
     else:
         return {}
 
+@lru_cache(maxsize=TYPE_CHECKS_CACHE_SIZE)
+def _issubclass(cls: type, types: Tuple[ExtendedType]) -> bool:
+    return issubclass(cls, types)
+
 ############################################ AWAITABLES ###########################################
 
 async def call_at(loop, time: float, coro: Awaitable):
@@ -0,0 +1,225 @@
+############################################# IMPORTS #############################################
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from typing import (
+    Callable,
+    Dict,
+    Tuple
+)
+
+############################################# GLOBALS #############################################
+
+POLL_INTERVAL = 2.0
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+############################################# CLASSES #############################################
+
+class Watcher:
+    """Base class of file changes watchers.
+
+    A watcher reports, from its own thread, every file created,
+    modified or deleted within the watched directory trees.
+
+    Parameters
+        callback: Callable[[`str`], None]
+            The function called with the path of every changed file
+
+    """
+    def __init__(self, callback: Callable[[str], None]):
+        self.callback = callback
+
+        self._roots = []
+        self._thread: threading.Thread = None
+        self._running = False
+
+    def watch(self, root: str):
+        """Adds a directory tree to watch.
+
+        Parameters
+            root: `str`
+                The directory to watch, with its subdirectories
+
+        """
+        self._roots.append(root)
+
+    def start(self):
+        """Starts watching in a background thread."""
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"config-{self.__class__.__name__.lower()}",
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stops watching, within the next event or poll."""
+        self._running = False
+        self._thread = None
+
+    def _run(self):
+        raise NotImplementedError
+
+class InotifyWatcher(Watcher):
+    """Watches files through Linux inotify, so that changes
+    are reported right away, at no cost in between.
+
+    """
+    def __init__(self, callback: Callable[[str], None]):
+        super().__init__(callback)
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._directories: Dict[int, str] = {}
+        self._wakeup = os.pipe()
+        self._closing = threading.Lock()
+
+    def watch(self, root: str):
+        super().watch(root)
+        self._add(root)
+
+    def stop(self):
+        """Stops watching right away, releasing the inotify instance."""
+        started = self._thread is not None
+        super().stop()
+        if started: # unblocks _run, which then closes file descriptors
+            os.write(self._wakeup[1], b"\0")
+        else:
+            self._close()
+
+    def _close(self):
+        with self._closing:
+            if self._fd is not None:
+                for fd in (self._fd, *self._wakeup):
+                    os.close(fd)
+                self._fd = None
+
+    def _add(self, root: str):
+        for directory, _, _ in os.walk(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), INOTIFY_MASK)
+            if wd >= 0:
+                self._directories[wd] = directory
+
+    def _run(self):
+        try:
+            self._read()
+        finally:
+            self._close()
+
+    def _read(self):
+        while True:
+            readable, _, _ = select.select([self._fd, self._wakeup[0]], [], [])
+            if self._wakeup[0] in readable:
+                return
+            buffer = os.read(self._fd, 1 << 16)
+
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(buffer, offset)
+                offset += INOTIFY_EVENT.size
+                name = buffer[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                directory = self._directories.get(wd)
+                if directory is None or not name:
+                    continue
+
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self._add(path)
+                elif not mask & IN_CREATE: # content comes with following close
+                    self.callback(path)
+
+class PollingWatcher(Watcher):
+    """Watches files by comparing their status every interval
+    seconds, wherever inotify isn't available.
+
+    Parameters
+        callback: Callable[[`str`], None]
+            The function called with the path of every changed file
+        interval: `float` = `POLL_INTERVAL`
+            The time between two polls, in seconds
+
+    """
+    def __init__(self, callback: Callable[[str], None], interval: float = POLL_INTERVAL):
+        super().__init__(callback)
+        self.interval = interval
+
+        self._stats: Dict[str, Tuple[int, int, int]] = {}
+
+    def watch(self, root: str):
+        super().watch(root)
+        self._stats.update(self._scan(root))
+
+    @staticmethod
+    def _scan(root: str) -> Dict[str, Tuple[int, int, int]]:
+        stats = {}
+        for directory, _, files in os.walk(root):
+            for file in files:
+                path = os.path.join(directory, file)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError: # removed meanwhile
+                    continue
+                stats[path] = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        return stats
+
+    def _run(self):
+        while self._running:
+            time.sleep(self.interval)
+
+            stats = {}
+            for root in self._roots:
+                stats.update(self._scan(root))
+
+            changed = {path for path, stat in stats.items() if self._stats.get(path) != stat}
+            changed.update(path for path in self._stats if path not in stats)
+            self._stats = stats
+
+            for path in changed:
+                self.callback(path)
+
+############################################ FUNCTIONS ############################################
+
+def make_watcher(callback: Callable[[str], None]) -> Watcher:
+    """Returns the best available watcher: `InotifyWatcher` on
+    Linux, `PollingWatcher` anywhere else.
+
+    Parameters
+        callback: Callable[[`str`], None]
+            The function called with the path of every changed file
+
+    Returns
+        `Watcher`
+
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(callback)
+        except (AttributeError, OSError): # no inotify support
+            pass
+
+    return PollingWatcher(callback)